@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+AI Project Template - Project Analyzer
+Executa detect-language e framework-detector no mesmo processo sobre um único
+inventário e um único cache de conteúdo: o projeto é percorrido e cada arquivo
+é lido uma vez. A linguagem detectada alimenta diretamente a detecção de
+frameworks, e o resultado combinado sai em um único documento JSON/YAML que os
+targets do Makefile consomem sem repetir a detecção.
+"""
+
+import os
+import sys
+import json
+import yaml
+import argparse
+import cProfile
+import contextlib
+import importlib.util
+from pathlib import Path
+from typing import Any, Dict, Optional
+from dataclasses import dataclass
+
+from project_scanner import (
+    DEFAULT_SKIP_DIRS, CachingReader, DetectionMetrics, EventEmitter, FileInventory, ScanBudget,
+    ScanCache, is_archive, result_to_dict, scan_archive, scan_git_revision, scan_project
+)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+def _load_script(name: str):
+    """Carregar um script com hífen no nome (ex: detect-language.py) como módulo"""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    # Registrado para que funções do módulo possam ir para o pool de processos
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+language_module = _load_script('detect-language')
+framework_module = _load_script('framework-detector')
+LanguageDetector = language_module.LanguageDetector
+FrameworkDetector = framework_module.FrameworkDetector
+
+
+@dataclass
+class AnalysisResult:
+    """Linguagem e frameworks de um projeto, detectados sobre o mesmo inventário"""
+    project: str
+    primary_language: str
+    primary_framework: Optional[str]
+    language: Any  # DetectionResult
+    frameworks: Any  # FrameworkDetectionResult
+    partial: bool = False  # Alguma das detecções não cobriu o projeto inteiro
+    metrics: Optional[Dict[str, Any]] = None  # Travessia e cache de conteúdo (--profile)
+
+
+class ProjectAnalyzer:
+    """Detecção de linguagem seguida da de frameworks, com uma travessia e uma leitura por arquivo"""
+
+    def __init__(self, project_path: str, skip_dirs: Optional[Any] = None, use_ignore_files: bool = True,
+                 cache: Optional[ScanCache] = None, workers: Optional[int] = None,
+                 use_processes: bool = False, backend: str = 'auto', rev: Optional[str] = None,
+                 polyglot: bool = False, events: Optional[EventEmitter] = None, metrics: Optional[DetectionMetrics] = None):
+        """Inicializar analisador para um projeto (diretório, .zip/.tar ou '-')"""
+        self.archive = project_path if is_archive(project_path) else None
+        self.project_path = project_path
+        self.skip_dirs = skip_dirs
+        self.use_ignore_files = use_ignore_files
+        self.cache = cache
+        self.workers = workers
+        self.use_processes = use_processes
+        self.backend = backend
+        self.rev = rev
+        self.polyglot = polyglot  # Frameworks de todas as linguagens, agrupados
+        self.events = events
+        self.metrics = metrics
+        self.inventory: Optional[FileInventory] = None
+
+    def analyze(self, budget: Optional[ScanBudget] = None) -> AnalysisResult:
+        """Executar as duas detecções sobre o inventário compartilhado
+
+        O mesmo `budget` vale para a travessia e para as duas detecções.
+        """
+        self._ensure_inventory(budget)
+        reader = self.inventory.reader
+
+        options = {
+            'inventory': self.inventory, 'workers': self.workers, 'use_processes': self.use_processes,
+            'quiet': True, 'events': self.events
+        }
+        language_result = LanguageDetector(
+            self.project_path, cache=self.cache,
+            metrics=DetectionMetrics() if self.metrics is not None else None, **options
+        ).detect(budget)
+        framework_result = FrameworkDetector(
+            self.project_path, cache=self.cache,
+            metrics=DetectionMetrics() if self.metrics is not None else None, **options
+        ).detect(language_result.primary_language, budget, polyglot=self.polyglot)
+
+        metrics = None
+        if self.metrics is not None:
+            self.metrics.count('files_indexed', len(self.inventory))
+            self.metrics.count('content_cache_hits', reader.hits)
+            self.metrics.count('content_cache_misses', reader.misses)
+            metrics = self.metrics.as_dict()
+
+        return AnalysisResult(
+            project=str(self.archive or Path(self.project_path).resolve()),
+            primary_language=language_result.primary_language,
+            primary_framework=framework_result.primary_framework,
+            language=language_result,
+            frameworks=framework_result,
+            partial=language_result.partial or framework_result.partial,
+            metrics=metrics
+        )
+
+    def _ensure_inventory(self, budget: Optional[ScanBudget]):
+        """Travessia única; o conteúdo lido passa a ser compartilhado pelos detectores"""
+        if self.inventory is None:
+            phase = self.metrics.phase('inventory') if self.metrics is not None else contextlib.nullcontext()
+            with phase:
+                if self.rev:
+                    self.inventory = scan_git_revision(Path(self.project_path).resolve(), self.rev, self.skip_dirs)
+                elif self.archive:
+                    self.inventory = scan_archive(self.archive, self.skip_dirs, wanted=self._wants_member)
+                else:
+                    self.inventory = scan_project(
+                        Path(self.project_path).resolve(), skip_dirs=self.skip_dirs,
+                        use_ignore_files=self.use_ignore_files, cache=self.cache, backend=self.backend,
+                        budget=budget, events=self.events, metrics=self.metrics
+                    )
+        if not isinstance(self.inventory.reader, CachingReader):
+            self.inventory.reader = CachingReader(self.inventory.reader)
+
+    @staticmethod
+    def _wants_member(path: str) -> bool:
+        """Membros de arquivo compactado que alguma das detecções lê"""
+        return LanguageDetector.wants_member(path) or FrameworkDetector.wants_member(path)
+
+
+def main():
+    """CLI da análise combinada"""
+    parser = argparse.ArgumentParser(description='AI Project Template - Project Analyzer')
+    parser.add_argument('project_path', nargs='?', default='.',
+                        help='Caminho para o projeto (diretório, .zip/.tar ou - para stdin)')
+    parser.add_argument('--output', '-o', choices=['json', 'yaml', 'text'], default='text',
+                        help='Formato de saída')
+    parser.add_argument('--save', metavar='ARQUIVO',
+                        help='Gravar também o resultado em JSON no arquivo (para consumo por outros comandos)')
+    parser.add_argument('--skip-dir', action='append', default=[], metavar='NOME',
+                        help='Diretório adicional a ignorar na travessia (pode repetir)')
+    parser.add_argument('--no-ignore', action='store_true',
+                        help='Não respeitar .gitignore/.ignore do projeto')
+    parser.add_argument('--cache', nargs='?', const='auto', metavar='ARQUIVO',
+                        help='Reaproveitar travessia/evidências da execução anterior '
+                             '(padrão: cache no diretório temporário)')
+    parser.add_argument('--workers', '-j', type=int, metavar='N',
+                        help='Número de workers para leitura de conteúdo (1 = serial)')
+    parser.add_argument('--processes', action='store_true',
+                        help='Usar pool de processos em vez de threads na busca de conteúdo')
+    parser.add_argument('--backend', choices=['auto', 'walk'], default='auto',
+                        help='Enumeração de arquivos: auto = índice do git em work trees, '
+                             'walk = sempre percorrer o disco')
+    parser.add_argument('--rev', metavar='REVISÃO',
+                        help='Analisar uma revisão git (commit, tag, branch) sem checkout')
+    parser.add_argument('--polyglot', action='store_true',
+                        help='Avaliar os frameworks de todas as linguagens e agrupá-los por linguagem')
+    parser.add_argument('--deadline', type=float, metavar='SEGUNDOS',
+                        help='Prazo da análise; ao esgotar, devolve resultado parcial')
+    parser.add_argument('--max-files', type=int, metavar='N',
+                        help='Máximo de arquivos com conteúdo lido')
+    parser.add_argument('--max-bytes', type=int, metavar='N',
+                        help='Máximo de bytes de conteúdo lidos')
+    parser.add_argument('--events', choices=['ndjson'],
+                        help='Emitir eventos de progresso/evidência em stdout durante a análise '
+                             '(o resultado final vem no evento "result")')
+    parser.add_argument('--profile', nargs='?', const='', metavar='ARQUIVO.pstats',
+                        help='Incluir métricas no resultado; com ARQUIVO, salvar também '
+                             'o perfil cProfile (pstats)')
+
+    args = parser.parse_args()
+
+    if args.project_path != '-' and not os.path.exists(args.project_path):
+        print(f"❌ Erro: Caminho '{args.project_path}' não encontrado")
+        return 1
+
+    cache = None
+    if args.cache:
+        cache = ScanCache.for_project(args.project_path, 'analyze') if args.cache == 'auto' else ScanCache(args.cache)
+
+    analyzer = ProjectAnalyzer(
+        args.project_path,
+        skip_dirs=DEFAULT_SKIP_DIRS | set(args.skip_dir),
+        use_ignore_files=not args.no_ignore,
+        cache=cache,
+        workers=args.workers,
+        use_processes=args.processes,
+        backend=args.backend,
+        rev=args.rev,
+        polyglot=args.polyglot,
+        events=EventEmitter() if args.events else None,
+        metrics=DetectionMetrics() if args.profile is not None else None
+    )
+    if args.rev:
+        # Validar a revisão antes de iniciar a análise
+        try:
+            analyzer.inventory = scan_git_revision(Path(args.project_path).resolve(), args.rev, analyzer.skip_dirs)
+        except ValueError as e:
+            print(f"❌ Erro: {e}")
+            return 1
+
+    budget = None
+    if args.deadline is not None or args.max_files is not None or args.max_bytes is not None:
+        budget = ScanBudget(args.deadline, args.max_files, args.max_bytes)
+
+    if args.output == 'text' and not args.events:
+        print(f"🔍 Analisando projeto: {args.project_path}")
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+
+    result = analyzer.analyze(budget)
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+
+    data = result_to_dict(result)
+    if args.save:
+        try:
+            Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.save, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            print(f"❌ Erro: não foi possível gravar '{args.save}': {e}", file=sys.stderr)
+            return 1
+
+    if args.events:
+        analyzer.events.emit('result', result=data)
+    elif args.output == 'json':
+        print(json.dumps(data, indent=2, ensure_ascii=False))
+    elif args.output == 'yaml':
+        print(yaml.dump(data, default_flow_style=False, allow_unicode=True))
+    else:
+        language, frameworks = result.language, result.frameworks
+        print(f"\n🔬 **Análise do Projeto:**")
+        print(f"   📋 Projeto: {args.project_path}")
+        print(f"   🔤 Linguagem: {language.primary_language} ({language.confidence:.1%})")
+        print(f"   🎯 Framework Principal: {frameworks.primary_framework or 'Nenhum detectado'}")
+        if frameworks.detected_frameworks:
+            print(f"   🚀 Frameworks: " + ', '.join(
+                f"{fw.name}{f' v{fw.version}' if fw.version else ''} ({fw.confidence:.1%})"
+                for fw in frameworks.detected_frameworks
+            ))
+        for lang, found in (frameworks.frameworks_by_language or {}).items():
+            if lang != language.primary_language:
+                print(f"   🌐 Frameworks ({lang}): " + ', '.join(
+                    f"{fw.name}{f' v{fw.version}' if fw.version else ''} ({fw.confidence:.1%})" for fw in found
+                ))
+        print(f"   📦 Gerenciadores: {', '.join(language.package_managers) or 'Nenhum detectado'}")
+        print(f"   🏗️  Tipo: {language.project_type} | {frameworks.project_type}")
+        print(f"   📁 Estrutura sugerida: {language.suggested_structure}")
+        if result.partial:
+            coverage = min(language.coverage, frameworks.coverage)
+            print(f"   ⚠️  Resultado parcial: {coverage:.1%} do projeto analisado")
+
+        if frameworks.recommendations:
+            print(f"\n💡 **Recomendações:**")
+            for rec in frameworks.recommendations:
+                print(f"   • {rec}")
+
+        if result.metrics:
+            print(f"\n⏱️  **Métricas:**")
+            for name, value in result.metrics['counters'].items():
+                print(f"   • {name}: {value}")
+        if args.save:
+            print(f"\n💾 Resultado salvo em: {args.save}")
+
+    if args.profile:
+        print(f"📈 Perfil cProfile salvo em: {args.profile}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
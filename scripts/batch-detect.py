@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+AI Project Template - Batch Detection
+Executa a análise combinada (analyze-project: detect-language seguido de
+framework-detector sobre um único inventário) em muitos projetos (diretórios
+ou arquivos .zip/.tar) em um único pool de processos, emitindo uma linha JSON
+(JSONL) por projeto.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import importlib.util
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from project_scanner import DEFAULT_SKIP_DIRS, ScanBudget, result_to_dict
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Fração do timeout após a qual a detecção devolve um resultado parcial
+SOFT_DEADLINE_RATIO = 0.8
+
+# Módulos dos scripts, carregados uma vez por processo do pool
+_DETECTORS: Dict[str, Any] = {}
+
+
+class DetectionTimeout(Exception):
+    """Tempo limite de detecção de um projeto excedido"""
+
+
+def _load_script(name: str):
+    """Carregar um script com hífen no nome (ex: detect-language.py) como módulo"""
+    if name not in _DETECTORS:
+        spec = importlib.util.spec_from_file_location(name.replace('-', '_'), SCRIPTS_DIR / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _DETECTORS[name] = module
+    return _DETECTORS[name]
+
+
+def _raise_timeout(signum, frame):
+    raise DetectionTimeout()
+
+
+def detect_project(job: Tuple[str, Optional[float], Dict[str, Any]]) -> Dict[str, Any]:
+    """Detectar linguagem e frameworks de um projeto (executado no pool)
+
+    Erros e timeouts viram um registro com status próprio, sem derrubar o lote.
+    Antes do timeout, um prazo mais curto faz os detectores devolverem o
+    melhor resultado até ali (marcado como parcial).
+    """
+    project_path, timeout, options = job
+    record: Dict[str, Any] = {'project': project_path, 'status': 'ok'}
+    start = time.perf_counter()
+
+    use_alarm = bool(timeout) and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        if not os.path.isdir(project_path) and not os.path.isfile(project_path):
+            raise FileNotFoundError(f"Caminho '{project_path}' não encontrado")
+
+        analyzer_module = _load_script('analyze-project')
+
+        # Prazo único para as duas detecções, contado a partir daqui
+        budget = ScanBudget(deadline=timeout * SOFT_DEADLINE_RATIO) if timeout else None
+
+        # Uma travessia e uma leitura por arquivo; a linguagem detectada
+        # alimenta a detecção de frameworks (os detectores ficam em silêncio)
+        result = analyzer_module.ProjectAnalyzer(project_path, **options).analyze(budget)
+
+        record['language'] = result_to_dict(result.language)
+        record['frameworks'] = result_to_dict(result.frameworks)
+    except DetectionTimeout:
+        record['status'] = 'timeout'
+        record['error'] = f"Tempo limite de {timeout}s excedido"
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    record['elapsed_seconds'] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def read_project_list(source: str) -> List[str]:
+    """Ler caminhos de projetos (um por linha) de um arquivo ou de stdin ('-')"""
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        return [
+            line.strip() for line in stream
+            if line.strip() and not line.lstrip().startswith('#')
+        ]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def run_batch(projects: Iterable[str], workers: Optional[int] = None, timeout: Optional[float] = None,
+              options: Optional[Dict[str, Any]] = None) -> Iterable[Dict[str, Any]]:
+    """Distribuir projetos no pool e produzir cada resultado assim que termina
+
+    Se um processo do pool morrer (ex: falta de memória), o pool é recriado e
+    os projetos em andamento são tentados mais uma vez antes de virarem erro.
+    """
+    options = options or {}
+    pending = [(project, 0) for project in projects]
+
+    while pending:
+        retry = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(detect_project, (project, timeout, options)): (project, attempts)
+                for project, attempts in pending
+            }
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    project, attempts = futures.pop(future)
+                    try:
+                        yield future.result()
+                    except BrokenProcessPool:
+                        if attempts == 0:
+                            retry.append((project, attempts + 1))
+                        else:
+                            yield {'project': project, 'status': 'error',
+                                   'error': 'Processo de detecção terminou inesperadamente'}
+        pending = retry
+
+
+def main():
+    """CLI para detecção em lote"""
+    parser = argparse.ArgumentParser(description='AI Project Template - Batch Detection (JSONL)')
+    parser.add_argument('projects', nargs='?', default='-',
+                        help="Arquivo com um caminho de projeto por linha ('-' = stdin)")
+    parser.add_argument('--workers', '-j', type=int, metavar='N',
+                        help='Número de processos no pool (padrão: número de CPUs)')
+    parser.add_argument('--timeout', '-t', type=float, default=300.0, metavar='SEGUNDOS',
+                        help='Tempo limite por projeto (0 = sem limite)')
+    parser.add_argument('--output', '-o', metavar='ARQUIVO',
+                        help='Gravar JSONL em arquivo em vez de stdout')
+    parser.add_argument('--skip-dir', action='append', default=[], metavar='NOME',
+                        help='Diretório adicional a ignorar na travessia (pode repetir)')
+    parser.add_argument('--no-ignore', action='store_true',
+                        help='Não respeitar .gitignore/.ignore dos projetos')
+    parser.add_argument('--backend', choices=['auto', 'walk'], default='auto',
+                        help='Enumeração de arquivos: auto = índice do git em work trees, '
+                             'walk = sempre percorrer o disco')
+
+    args = parser.parse_args()
+
+    try:
+        projects = read_project_list(args.projects)
+    except OSError as e:
+        print(f"❌ Erro: não foi possível ler lista de projetos: {e}", file=sys.stderr)
+        return 1
+
+    options = {
+        'skip_dirs': DEFAULT_SKIP_DIRS | set(args.skip_dir),
+        'use_ignore_files': not args.no_ignore,
+        'backend': args.backend,
+        'workers': 1  # O paralelismo é entre projetos
+    }
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    failures = 0
+    try:
+        for record in run_batch(projects, args.workers, args.timeout or None, options):
+            if record['status'] != 'ok':
+                failures += 1
+            output.write(json.dumps(record, ensure_ascii=False) + '\n')
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"✅ {len(projects) - failures}/{len(projects)} projetos analisados", file=sys.stderr)
+    return 0 if failures == 0 else 2
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+AI Project Template - Detector Benchmarks
+Gera árvores de projeto sintéticas e determinísticas (mesma semente = mesmos
+arquivos) e mede LanguageDetector e FrameworkDetector sobre elas: vazão
+(arquivos/s, MB/s), pico de memória e percentis de latência. Os resultados
+são gravados em JSON para comparação entre commits.
+"""
+
+import io
+import sys
+import math
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import resource
+import datetime
+import tempfile
+import subprocess
+import tracemalloc
+import contextlib
+import importlib.util
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+from project_scanner import DetectionMetrics
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Incrementar quando o conteúdo gerado mudar: árvores antigas são recriadas
+GENERATOR_VERSION = 1
+
+# Formato do arquivo de resultados
+RESULTS_VERSION = 1
+
+DETECTORS = {
+    'language': ('detect-language', 'LanguageDetector'),
+    'frameworks': ('framework-detector', 'FrameworkDetector'),
+}
+
+PYTHON_IMPORTS = ['os', 'sys', 'json', 're', 'typing', 'pathlib', 'logging', 'dataclasses']
+PYTHON_FRAMEWORK_IMPORTS = [
+    'from fastapi import APIRouter', 'import pytest', 'from django.db import models',
+    'import torch', 'from flask import Flask'
+]
+JS_IMPORTS = [
+    "import React, { useState } from 'react';", "const express = require('express');",
+    "import { createApp } from 'vue';", "import lodash from 'lodash';"
+]
+
+
+class ProjectWriter:
+    """Escrita de uma árvore sintética com gerador pseudo-aleatório fixo"""
+
+    def __init__(self, root: Path, seed: str):
+        self.root = root
+        self.rng = random.Random(seed)
+        self.files = 0
+        self.bytes = 0
+
+    def write(self, rel_path: str, content: str):
+        """Gravar um arquivo (criando diretórios intermediários)"""
+        path = self.root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = content.encode('utf-8')
+        path.write_bytes(data)
+        self.files += 1
+        self.bytes += len(data)
+
+    def write_bytes(self, rel_path: str, data: bytes):
+        """Gravar um arquivo binário"""
+        path = self.root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        self.files += 1
+        self.bytes += len(data)
+
+    def python_module(self, lines: int, framework_ratio: float = 0.2) -> str:
+        """Módulo Python com imports no topo e funções de tamanho variável"""
+        rng = self.rng
+        header = [f"import {name}" for name in rng.sample(PYTHON_IMPORTS, 3)]
+        if rng.random() < framework_ratio:
+            header.append(rng.choice(PYTHON_FRAMEWORK_IMPORTS))
+        body = []
+        while len(body) < lines:
+            name = f"func_{rng.randrange(10 ** 6)}"
+            body.extend([
+                '', '',
+                f"def {name}(value: int) -> int:",
+                f'    """Função gerada {name}"""',
+                f"    total = value * {rng.randrange(1, 100)}",
+                f"    for index in range({rng.randrange(1, 50)}):",
+                "        total += index",
+                "    return total",
+            ])
+        return '\n'.join(header + body) + '\n'
+
+    def js_module(self, lines: int, framework_ratio: float = 0.3) -> str:
+        """Módulo JavaScript com imports no topo"""
+        rng = self.rng
+        header = [rng.choice(JS_IMPORTS)] if rng.random() < framework_ratio else []
+        body = []
+        while len(body) < lines:
+            name = f"handler{rng.randrange(10 ** 6)}"
+            body.extend([
+                '',
+                f"export function {name}(value) {{",
+                f"  const total = value * {rng.randrange(1, 100)};",
+                "  return total + 1;",
+                "}",
+            ])
+        return '\n'.join(header + body) + '\n'
+
+
+def _python_service(writer: ProjectWriter, files: int):
+    """Serviço Python plano: um pacote com muitos módulos e testes"""
+    writer.write('requirements.txt', 'fastapi>=0.100.0\nuvicorn>=0.23\npytest>=7.4\n')
+    writer.write('pyproject.toml', '[project]\nname = "bench-service"\nversion = "0.1.0"\n')
+    writer.write('main.py', 'from fastapi import FastAPI\n\napp = FastAPI()\n\n\n'
+                            '@app.get("/")\ndef root():\n    return {}\n')
+    for index in range(max(files - 3, 1)):
+        if index % 5 == 4:
+            writer.write(f'tests/test_module_{index}.py',
+                         'import pytest\n\n\ndef test_value():\n    assert True\n')
+        else:
+            writer.write(f'app/module_{index}.py', writer.python_module(writer.rng.randrange(20, 200)))
+
+
+def _js_monorepo(writer: ProjectWriter, files: int):
+    """Monorepo JS profundo com workspaces e node_modules (que deve ser podado)"""
+    rng = writer.rng
+    packages = max(files // 50, 1)
+    writer.write('package.json', json.dumps({'name': 'bench-monorepo', 'private': True,
+                                             'workspaces': ['packages/*']}, indent=2))
+    writer.write('.gitignore', 'node_modules/\ndist/\n')
+    per_package = max(files // (2 * packages), 1)
+    for package in range(packages):
+        prefix = f'packages/pkg-{package}'
+        deps = {'react': '^18.2.0', 'react-dom': '^18.2.0'} if package % 2 else {'express': '^4.18.0'}
+        writer.write(f'{prefix}/package.json', json.dumps({'name': f'pkg-{package}', 'dependencies': deps},
+                                                          indent=2))
+        for index in range(per_package):
+            depth = rng.randrange(1, 7)
+            dirs = '/'.join(f'level{level}_{rng.randrange(3)}' for level in range(depth))
+            extension = rng.choice(['.js', '.jsx', '.mjs'])
+            writer.write(f'{prefix}/src/{dirs}/module_{index}{extension}', writer.js_module(rng.randrange(10, 120)))
+    # Dependências instaladas: metade do volume, nunca devem ser visitadas
+    for index in range(files // 2):
+        writer.write(f'node_modules/dep-{index % 40}/lib/file_{index}.js', writer.js_module(20, 0.0))
+
+
+def _polyglot(writer: ProjectWriter, files: int):
+    """Repositório poliglota: serviços em várias linguagens com seus manifestos"""
+    rng = writer.rng
+    services = {
+        'python': ('requirements.txt', 'flask>=2.3\n', '.py'),
+        'go': ('go.mod', 'module example.com/bench\n\ngo 1.21\n', '.go'),
+        'rust': ('Cargo.toml', '[package]\nname = "bench"\nversion = "0.1.0"\n', '.rs'),
+        'java': ('pom.xml', '<project><artifactId>bench</artifactId></project>\n', '.java'),
+        'typescript': ('package.json', '{"dependencies": {"@nestjs/core": "^10.0.0"}}\n', '.ts'),
+    }
+    per_service = max(files // (2 * len(services)), 1)
+    for copy in range(2):
+        for language, (manifest, content, extension) in services.items():
+            prefix = f'services/{language}-{copy}'
+            writer.write(f'{prefix}/{manifest}', content)
+            for index in range(per_service):
+                if extension == '.py':
+                    body = writer.python_module(rng.randrange(20, 120))
+                elif extension == '.ts':
+                    body = "import { Controller } from '@nestjs/common';\n" + writer.js_module(40, 0.0)
+                else:
+                    body = f"// {language} {index}\n" + '\n'.join(
+                        f"// linha {line} {rng.randrange(10 ** 6)}" for line in range(rng.randrange(20, 120))
+                    ) + '\n'
+                writer.write(f'{prefix}/src/module_{index}{extension}', body)
+
+
+def _large_files(writer: ProjectWriter, files: int):
+    """Poucos arquivos grandes (até ~1 MB) e alguns binários"""
+    rng = writer.rng
+    writer.write('requirements.txt', 'torch>=2.0\n')
+    for index in range(max(files // 50, 5)):
+        if index % 10 == 9:
+            writer.write_bytes(f'data/blob_{index}.py', bytes(rng.randrange(256) for _ in range(64 * 1024)))
+        else:
+            writer.write(f'src/large_{index}.py', writer.python_module(rng.randrange(4000, 20000), 0.5))
+
+
+SHAPES: Dict[str, Callable[[ProjectWriter, int], None]] = {
+    'python-service': _python_service,
+    'js-monorepo': _js_monorepo,
+    'polyglot': _polyglot,
+    'large-files': _large_files,
+}
+
+
+def generate_project(workdir: Path, shape: str, files: int, seed: int = 0) -> Dict[str, Any]:
+    """Gerar (ou reaproveitar) a árvore sintética de um formato
+
+    A árvore fica em `workdir/<formato>-<arquivos>-<semente>` e só é
+    recriada se os parâmetros ou GENERATOR_VERSION mudarem. Retorna a
+    descrição da árvore (caminho, arquivos e bytes escritos).
+    """
+    root = workdir / f'{shape}-{files}-{seed}'
+    marker = workdir / f'{root.name}.json'
+    spec = {'generator_version': GENERATOR_VERSION, 'shape': shape, 'files': files, 'seed': seed}
+
+    if marker.exists() and root.is_dir():
+        try:
+            info = json.loads(marker.read_text(encoding='utf-8'))
+            if info.get('spec') == spec:
+                return info
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    if root.exists():
+        shutil.rmtree(root)
+    writer = ProjectWriter(root, f'{shape}:{files}:{seed}')
+    SHAPES[shape](writer, files)
+
+    info = {'spec': spec, 'path': str(root), 'files': writer.files, 'bytes': writer.bytes}
+    marker.write_text(json.dumps(info, indent=2), encoding='utf-8')
+    return info
+
+
+def _load_detector(name: str):
+    """Classe do detector (scripts com hífen no nome são carregados via importlib)"""
+    script, class_name = DETECTORS[name]
+    spec = importlib.util.spec_from_file_location(script.replace('-', '_'), SCRIPTS_DIR / f'{script}.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, class_name)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil pelo posto mais próximo (valores já ordenados)"""
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+
+def run_case(job: Tuple[str, str, int, Dict[str, Any]]) -> Dict[str, Any]:
+    """Medir um detector sobre uma árvore (executado em processo próprio)
+
+    A primeira execução aquece caches do sistema e mede o pico de memória
+    alocada (tracemalloc); as `repeat` seguintes medem só a latência.
+    """
+    detector_name, project_path, repeat, options = job
+    detector_class = _load_detector(detector_name)
+
+    def detect(metrics: Optional[DetectionMetrics] = None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return detector_class(project_path, quiet=True, metrics=metrics, **options).detect()
+
+    tracemalloc.start()
+    metrics = DetectionMetrics()
+    detect(metrics)
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        detect()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    median = percentile(latencies, 0.5)
+    counters = metrics.as_dict()['counters']
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    rss_unit = 1 if sys.platform == 'darwin' else 1024
+    return {
+        'latency_seconds': {
+            'min': round(latencies[0], 6),
+            'p50': round(median, 6),
+            'p90': round(percentile(latencies, 0.9), 6),
+            'p99': round(percentile(latencies, 0.99), 6),
+            'max': round(latencies[-1], 6),
+            'mean': round(sum(latencies) / len(latencies), 6),
+        },
+        'files_per_second': round(counters.get('files_visited', 0) / median, 1) if median else None,
+        'mb_per_second': round(counters.get('bytes_read', 0) / 1e6 / median, 3) if median else None,
+        'peak_traced_mb': round(peak_traced / 1e6, 3),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * rss_unit / 1e6, 1),
+        'counters': counters,
+    }
+
+
+def run_benchmarks(shapes: List[str], detectors: List[str], files: int, repeat: int, seed: int,
+                   workdir: Path, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Gerar as árvores e medir cada combinação (formato, detector)"""
+    cases = []
+    for shape in shapes:
+        print(f"🏗️  Gerando {shape} ({files} arquivos)...", file=sys.stderr)
+        tree = generate_project(workdir, shape, files, seed)
+        for detector_name in detectors:
+            print(f"⏱️  {shape} / {detector_name} ({repeat} execuções)...", file=sys.stderr)
+            # Processo novo por caso: pico de RSS e caches do módulo não vazam entre casos
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                measured = executor.submit(run_case, (detector_name, tree['path'], repeat, options)).result()
+            cases.append({
+                'shape': shape,
+                'detector': detector_name,
+                'tree_files': tree['files'],
+                'tree_bytes': tree['bytes'],
+                'repeat': repeat,
+                **measured
+            })
+
+    return {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'files': files, 'repeat': repeat, 'seed': seed, 'generator_version': GENERATOR_VERSION,
+                   'options': options},
+        'cases': cases,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    """Commit atual do repositório dos scripts, se disponível"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPTS_DIR,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Imprimir variação de latência (p50) por caso; retorna os casos que regrediram"""
+    previous = {(case['shape'], case['detector']): case for case in baseline.get('cases', [])}
+    regressions = []
+
+    print(f"\n📊 **Comparação com {baseline.get('commit') or 'baseline'}:**")
+    for case in current['cases']:
+        key = (case['shape'], case['detector'])
+        if key not in previous:
+            print(f"   • {key[0]} / {key[1]}: sem referência")
+            continue
+        before = previous[key]['latency_seconds']['p50']
+        after = case['latency_seconds']['p50']
+        change = (after - before) / before * 100 if before else 0.0
+        marker = '🔴' if change > threshold else '🟢' if change < -threshold else '⚪'
+        print(f"   {marker} {key[0]} / {key[1]}: p50 {before * 1000:.1f} ms → {after * 1000:.1f} ms "
+              f"({change:+.1f}%)")
+        if change > threshold:
+            regressions.append(f"{key[0]}/{key[1]}")
+
+    return regressions
+
+
+def _print_results(results: Dict[str, Any]):
+    """Imprimir resumo dos casos em formato texto"""
+    print(f"\n🏁 **Benchmark dos detectores** (commit {results['commit'] or '?'}):")
+    for case in results['cases']:
+        latency = case['latency_seconds']
+        print(f"   • {case['shape']} / {case['detector']}: "
+              f"p50 {latency['p50'] * 1000:.1f} ms | p90 {latency['p90'] * 1000:.1f} ms | "
+              f"{case['files_per_second']} arquivos/s | {case['mb_per_second']} MB/s | "
+              f"pico {case['peak_traced_mb']} MB (RSS {case['peak_rss_mb']} MB)")
+
+
+def main():
+    """CLI para benchmarks dos detectores"""
+    parser = argparse.ArgumentParser(description='AI Project Template - Detector Benchmarks')
+    parser.add_argument('--shape', action='append', choices=sorted(SHAPES), metavar='FORMATO',
+                        help=f"Formato de árvore a medir (pode repetir; padrão: todos). "
+                             f"Opções: {', '.join(sorted(SHAPES))}")
+    parser.add_argument('--detector', action='append', choices=sorted(DETECTORS),
+                        help='Detector a medir (pode repetir; padrão: todos)')
+    parser.add_argument('--files', type=int, default=2000, metavar='N',
+                        help='Tamanho aproximado de cada árvore, em arquivos')
+    parser.add_argument('--repeat', type=int, default=5, metavar='N',
+                        help='Execuções medidas por caso (após uma de aquecimento)')
+    parser.add_argument('--seed', type=int, default=0, help='Semente do gerador')
+    parser.add_argument('--workdir', metavar='DIR',
+                        help='Onde gerar as árvores (padrão: diretório temporário, reaproveitado)')
+    parser.add_argument('--workers', '-j', type=int, metavar='N',
+                        help='Workers de leitura de conteúdo repassados aos detectores')
+    parser.add_argument('--output', '-o', metavar='ARQUIVO',
+                        help='Gravar resultados em JSON')
+    parser.add_argument('--compare', metavar='ARQUIVO',
+                        help='Comparar com resultados anteriores (JSON gerado por --output)')
+    parser.add_argument('--threshold', type=float, default=10.0, metavar='PCT',
+                        help='Aumento de latência p50 (%%) considerado regressão')
+
+    args = parser.parse_args()
+
+    if args.files < 1 or args.repeat < 1:
+        print("❌ Erro: --files e --repeat devem ser positivos")
+        return 1
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"❌ Erro: não foi possível ler {args.compare}: {e}")
+            return 1
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.gettempdir()) / 'ai-template-benchmarks'
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    results = run_benchmarks(
+        args.shape or list(SHAPES), args.detector or list(DETECTORS), args.files, args.repeat,
+        args.seed, workdir, {'workers': args.workers}
+    )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"💾 Resultados salvos em: {args.output}", file=sys.stderr)
+
+    _print_results(results)
+
+    if baseline is not None:
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Regressões acima de {args.threshold:.0f}%: {', '.join(regressions)}")
+            return 2
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+AI Project Template - Dependency Index
+Manifestos de dependência da raiz do projeto (requirements*.txt, pyproject.toml,
+Pipfile, setup.py, package.json, go.mod, Cargo.toml, pom.xml, build.gradle)
+lidos e interpretados uma única vez. Cada verificação de dependência passa a
+ser uma consulta por nome normalizado, sem reler nem varrer arquivos.
+Lockfiles (que chegam a dezenas de MB) são lidos em fluxo, linha a linha,
+apenas até resolver as versões pedidas.
+"""
+
+import re
+import ast
+import json
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from project_scanner import DetectionMetrics, FileInventory
+
+try:
+    import tomllib  # Python 3.11+
+except ImportError:  # pragma: no cover
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# Ecossistema de pacotes de cada linguagem
+LANGUAGE_ECOSYSTEMS = {
+    'python': 'pypi',
+    'javascript': 'npm',
+    'typescript': 'npm',
+    'go': 'go',
+    'rust': 'cargo',
+    'java': 'maven'
+}
+
+# Extras/grupos de dependências considerados de desenvolvimento
+DEV_GROUPS = frozenset(['dev', 'develop', 'development', 'test', 'tests', 'testing', 'lint', 'docs', 'typing'])
+
+# Nome no início de um requisito PEP 508 (ex: 'fastapi[all]>=0.100 ; python_version>"3.8"')
+REQUIREMENT_PATTERN = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*([^;@]*)')
+# Início das opções de um requisito em requirements.txt (ex: 'pkg==1.0 --hash=sha256:...')
+REQUIREMENT_OPTION_PATTERN = re.compile(r'\s--?[A-Za-z]')
+VERSION_PATTERN = re.compile(r'\d+(?:\.\d+)*')
+
+# Linhas de lockfile mais longas que isso são lidas em pedaços (memória constante)
+LOCKFILE_LINE_LIMIT = 64 * 1024
+
+
+@dataclass(frozen=True)
+class Dependency:
+    """Dependência declarada em um manifesto"""
+    name: str  # Nome como declarado
+    spec: str  # Especificação de versão ('' quando não informada)
+    source: str  # Manifesto de origem (caminho relativo)
+    ecosystem: str  # pypi, npm, go, cargo, maven
+    dev: bool = False  # Só para desenvolvimento/testes
+    locked: Optional[str] = None  # Versão resolvida no lockfile, se consultado
+
+    @property
+    def version(self) -> Optional[str]:
+        """Versão do lockfile ou, sem ela, o primeiro número da especificação ('^18.2.0' -> '18.2.0')"""
+        match = VERSION_PATTERN.search(self.locked or self.spec)
+        return match.group(0) if match else None
+
+
+def normalize_name(name: str, ecosystem: str) -> str:
+    """Nome canônico para consulta (PEP 503 no PyPI; minúsculas nos demais, exceto Go)"""
+    if ecosystem == 'pypi':
+        return re.sub(r'[-_.]+', '-', name).lower()
+    if ecosystem == 'go':
+        return name
+    return name.lower()
+
+
+class DependencyIndex:
+    """Dependências do projeto por (ecossistema, nome normalizado)
+
+    Uma dependência declarada em vários manifestos aparece uma vez: vale a
+    primeira declaração, completada com a versão de outra se faltar, e ela
+    só é de desenvolvimento se todas as declarações forem.
+    """
+
+    def __init__(self, dependencies: Iterable[Dependency] = ()):
+        self._entries: Dict[Tuple[str, str], Dependency] = {}
+        self.sources: List[str] = []
+        for dependency in dependencies:
+            self.add(dependency)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Dependency]:
+        return iter(self._entries.values())
+
+    def add(self, dependency: Dependency):
+        """Registrar uma dependência, mesclando com declarações anteriores"""
+        key = (dependency.ecosystem, normalize_name(dependency.name, dependency.ecosystem))
+        existing = self._entries.get(key)
+        if existing is None:
+            self._entries[key] = dependency
+        else:
+            self._entries[key] = replace(
+                existing, spec=existing.spec or dependency.spec, dev=existing.dev and dependency.dev
+            )
+
+    def get(self, name: str, ecosystem: str) -> Optional[Dependency]:
+        """Dependência pelo nome (qualquer grafia equivalente), ou None"""
+        return self._entries.get((ecosystem, normalize_name(name, ecosystem)))
+
+    def for_ecosystem(self, ecosystem: str) -> List[Dependency]:
+        """Dependências de um ecossistema, na ordem de declaração"""
+        return [dependency for (eco, _), dependency in self._entries.items() if eco == ecosystem]
+
+    def resolve_locked(self, inventory: FileInventory, names: Iterable[str], ecosystem: str,
+                       metrics: Optional[DetectionMetrics] = None):
+        """Preencher `locked` das dependências pedidas a partir dos lockfiles da raiz
+
+        Só nomes declarados em algum manifesto são procurados, e cada lockfile
+        é lido em fluxo até que todos estejam resolvidos.
+        """
+        pending: Dict[str, Optional[str]] = {}  # nome normalizado -> faixa declarada
+        for name in names:
+            dependency = self.get(name, ecosystem)
+            if dependency is not None and dependency.locked is None:
+                pending[normalize_name(name, ecosystem)] = dependency.spec
+        for pattern, lock_ecosystem, parser in LOCKFILE_PARSERS:
+            if not pending:
+                break
+            if lock_ecosystem != ecosystem:
+                continue
+            for entry in inventory.match(pattern):
+                if entry.depth != 0 or not pending:
+                    continue
+                try:
+                    resolved = read_lockfile(inventory.reader, entry.path, parser, ecosystem, pending, metrics)
+                except OSError:
+                    continue
+                for name, version in resolved.items():
+                    key = (ecosystem, name)
+                    self._entries[key] = replace(self._entries[key], locked=version)
+                    del pending[name]
+
+
+def build_dependency_index(inventory: FileInventory,
+                           metrics: Optional[DetectionMetrics] = None) -> DependencyIndex:
+    """Ler e interpretar cada manifesto da raiz do projeto uma única vez
+
+    Manifestos ilegíveis ou malformados são ignorados individualmente.
+    """
+    index = DependencyIndex()
+    for pattern, ecosystem, parser in MANIFEST_PARSERS:
+        for entry in inventory.match(pattern):
+            if entry.depth != 0:
+                continue
+            try:
+                content = inventory.reader.read_text(entry.path)
+            except (UnicodeDecodeError, OSError):
+                continue
+            if metrics is not None:
+                metrics.count('files_read')
+                metrics.count('bytes_read', len(content.encode('utf-8')))
+            try:
+                declared = list(parser(content, entry.path))
+            except (ValueError, SyntaxError, ElementTree.ParseError):
+                continue
+            index.sources.append(entry.path)
+            for name, spec, dev in declared:
+                index.add(Dependency(name, spec, entry.path, ecosystem, dev))
+    return index
+
+
+# Parsers: (conteúdo, caminho) -> [(nome, especificação, dev)]
+Declared = Iterable[Tuple[str, str, bool]]
+
+
+def parse_requirement(requirement: str) -> Optional[Tuple[str, str]]:
+    """Nome e especificação de um requisito PEP 508, ou None"""
+    if '#egg=' in requirement:  # git+https://...#egg=nome
+        return requirement.split('#egg=', 1)[1].split('&')[0].strip(), ''
+    match = REQUIREMENT_PATTERN.match(requirement)
+    if not match:
+        return None
+    return match.group(1), re.sub(r'\s+', '', match.group(2))
+
+
+def _parse_requirements(content: str, path: str) -> Declared:
+    dev = any(group in path.lower() for group in DEV_GROUPS)
+    # Linha terminada em barra invertida continua na seguinte (ex: '--hash=...' na linha abaixo do requisito)
+    for line in re.sub(r'\\\r?\n', ' ', content).splitlines():
+        line = line.split(' #', 1)[0].strip()
+        if not line or line.startswith(('#', '-')):  # Comentários e opções (-r, -e, --index-url)
+            continue
+        # Opções do requisito ('--hash=...', '--config-settings ...') não fazem parte da especificação
+        line = REQUIREMENT_OPTION_PATTERN.split(line, 1)[0].rstrip(' \t\\')
+        parsed = parse_requirement(line)
+        if parsed:
+            yield parsed + (dev,)
+
+
+def _parse_pyproject(content: str, path: str) -> Declared:
+    data = _loads_toml(content)
+    project = data.get('project', {})
+    for requirement in project.get('dependencies', []):
+        parsed = parse_requirement(requirement)
+        if parsed:
+            yield parsed + (False,)
+    for group, requirements in project.get('optional-dependencies', {}).items():
+        for requirement in requirements:
+            parsed = parse_requirement(requirement)
+            if parsed:
+                yield parsed + (group.lower() in DEV_GROUPS,)
+    for group, requirements in data.get('dependency-groups', {}).items():
+        for requirement in requirements:
+            parsed = parse_requirement(requirement) if isinstance(requirement, str) else None
+            if parsed:
+                yield parsed + (True,)
+
+    # Poetry
+    poetry = data.get('tool', {}).get('poetry', {})
+    tables = [(poetry.get('dependencies', {}), False), (poetry.get('dev-dependencies', {}), True)]
+    tables += [(group.get('dependencies', {}), True) for group in poetry.get('group', {}).values()]
+    for table, dev in tables:
+        for name, spec in table.items():
+            if name.lower() != 'python':
+                yield name, _table_spec(spec), dev
+
+
+def _parse_pipfile(content: str, path: str) -> Declared:
+    data = _loads_toml(content)
+    for section, dev in (('packages', False), ('dev-packages', True)):
+        for name, spec in data.get(section, {}).items():
+            yield name, _table_spec(spec), dev
+
+
+def _parse_setup_py(content: str, path: str) -> Declared:
+    """install_requires/extras_require/tests_require de setup(), sem executar o arquivo"""
+    tree = ast.parse(content)
+    constants: Dict[str, Any] = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            constants[node.targets[0].id] = node.value
+
+    def literal(node: Any) -> Any:
+        if isinstance(node, ast.Name) and node.id in constants:
+            node = constants[node.id]
+        try:
+            return ast.literal_eval(node)
+        except ValueError:
+            return None
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else getattr(func, 'attr', None)
+        if name != 'setup':
+            continue
+        for keyword in node.keywords:
+            value = literal(keyword.value)
+            if keyword.arg in ('install_requires', 'tests_require', 'setup_requires'):
+                groups = {keyword.arg: value}
+            elif keyword.arg == 'extras_require' and isinstance(value, dict):
+                groups = value
+            else:
+                continue
+            for group, requirements in groups.items():
+                if isinstance(requirements, str):
+                    requirements = requirements.splitlines()
+                dev = group == 'tests_require' or str(group).lower() in DEV_GROUPS
+                for requirement in requirements or ():
+                    parsed = parse_requirement(requirement) if isinstance(requirement, str) else None
+                    if parsed:
+                        yield parsed + (dev,)
+
+
+def _parse_package_json(content: str, path: str) -> Declared:
+    data = json.loads(content)
+    sections = (('dependencies', False), ('peerDependencies', False),
+                ('optionalDependencies', False), ('devDependencies', True))
+    for section, dev in sections:
+        table = data.get(section)
+        if isinstance(table, dict):
+            for name, spec in table.items():
+                yield name, spec if isinstance(spec, str) else '', dev
+
+
+def _parse_go_mod(content: str, path: str) -> Declared:
+    in_block = False
+    for line in content.splitlines():
+        line = line.split('//', 1)[0].strip()
+        if in_block:
+            if line == ')':
+                in_block = False
+                continue
+        elif line.startswith('require'):
+            line = line[len('require'):].strip()
+            if line == '(':
+                in_block = True
+                continue
+        else:
+            continue
+        parts = line.split()
+        if len(parts) >= 2:
+            yield parts[0], parts[1], False
+
+
+def _parse_cargo_toml(content: str, path: str) -> Declared:
+    data = _loads_toml(content)
+    for section, dev in (('dependencies', False), ('build-dependencies', False), ('dev-dependencies', True)):
+        for name, spec in data.get(section, {}).items():
+            if isinstance(spec, dict) and 'package' in spec:
+                name = spec['package']  # Dependência renomeada
+            yield name, _table_spec(spec), dev
+
+
+def _parse_pom_xml(content: str, path: str) -> Declared:
+    root = ElementTree.fromstring(content)
+    for element in root.iter():
+        if _local_name(element.tag) != 'dependency':
+            continue
+        fields = {_local_name(child.tag): (child.text or '').strip() for child in element}
+        if fields.get('groupId') and fields.get('artifactId'):
+            name = f"{fields['groupId']}:{fields['artifactId']}"
+            yield name, fields.get('version', ''), fields.get('scope') == 'test'
+
+
+GRADLE_DEPENDENCY = re.compile(
+    r'''^\s*(\w+)\s*\(?\s*['"]([^:'"\s]+):([^:'"\s]+)(?::([^'"\s]+))?['"]''', re.MULTILINE
+)
+
+
+def _parse_build_gradle(content: str, path: str) -> Declared:
+    for configuration, group, artifact, version in GRADLE_DEPENDENCY.findall(content):
+        yield f"{group}:{artifact}", version, configuration.lower().startswith('test')
+
+
+def _table_spec(spec: Any) -> str:
+    """Versão de uma entrada TOML ('1.0' ou {version = '1.0', ...}); '*' vira vazio"""
+    if isinstance(spec, dict):
+        spec = spec.get('version', '')
+    if not isinstance(spec, str) or spec.strip() == '*':
+        return ''
+    return spec.strip()
+
+
+def _local_name(tag: Any) -> str:
+    """Nome de um elemento XML sem o namespace"""
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def _loads_toml(content: str) -> Dict[str, Any]:
+    """TOML via tomllib/tomli; sem eles, leitura do subconjunto usado por manifestos"""
+    if tomllib is not None:
+        try:
+            return tomllib.loads(content)
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(str(e))
+    return _loads_toml_subset(content)
+
+
+def _loads_toml_subset(content: str) -> Dict[str, Any]:
+    """Tabelas [a.b], chaves com strings, listas de strings e tabelas inline simples"""
+    data: Dict[str, Any] = {}
+    table = data
+    lines = iter(content.splitlines())
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('[['):
+            table = {}  # Arrays de tabelas não são usados para dependências
+            continue
+        if line.startswith('['):
+            table = data
+            for part in line.strip('[]').split('.'):
+                table = table.setdefault(part.strip().strip('"\''), {})
+            continue
+        if '=' not in line:
+            continue
+        key, value = (part.strip() for part in line.split('=', 1))
+        if value.startswith('[') and not value.rstrip().endswith(']'):
+            for continuation in lines:
+                value += ' ' + continuation.split('#', 1)[0].strip()
+                if continuation.strip().endswith(']'):
+                    break
+        table[key.strip('"\'')] = _toml_value(value)
+    return data
+
+
+def _toml_value(value: str) -> Any:
+    if value.startswith('['):
+        return [double or single for double, single in re.findall(r'"([^"]*)"|\'([^\']*)\'', value)]
+    if value.startswith('{'):
+        return dict(
+            (key, double or single)
+            for key, double, single in re.findall(r'([\w-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', value)
+        )
+    match = re.match(r'"([^"]*)"|\'([^\']*)\'', value)
+    if match:
+        return match.group(1) if match.group(1) is not None else match.group(2)
+    return value
+
+
+# Leitores de lockfile: linhas -> [(nome, versão, faixas)] na ordem do arquivo;
+# faixas são as especificações que o registro resolve, quando o formato as guarda
+LockRecords = Iterator[Tuple[str, str, Tuple[str, ...]]]
+
+
+def read_lockfile(reader: Any, rel_path: str, parser: Callable[[Iterable[str]], LockRecords],
+                  ecosystem: str, wanted: Dict[str, Optional[str]],
+                  metrics: Optional[DetectionMetrics] = None) -> Dict[str, str]:
+    """Versões resolvidas dos nomes (normalizados) pedidos, lendo o lockfile em fluxo
+
+    `wanted` leva cada nome à faixa declarada no manifesto da raiz. Registros
+    de um mesmo pacote são contíguos nos lockfiles (ordenados por nome): a
+    leitura para no primeiro pacote não pedido depois que todos os pedidos
+    foram vistos. Com várias versões do mesmo pacote, vale a que resolve a
+    faixa da raiz (descritor do yarn.lock igual à faixa, ou versão fixada
+    igual, como no go.mod); sem nenhuma assim (ex: faixas do Cargo), vale a
+    maior, uma aproximação.
+    """
+    resolved: Dict[str, str] = {}
+    direct: Set[str] = set()  # Nomes resolvidos pela faixa da raiz
+    bytes_read = 0
+    with reader.open_stream(rel_path) as stream:
+        def lines() -> Iterator[str]:
+            nonlocal bytes_read
+            while True:
+                line = stream.readline(LOCKFILE_LINE_LIMIT)
+                if not line:
+                    return
+                bytes_read += len(line)
+                yield line.decode('utf-8', errors='replace')
+
+        for name, version, ranges in parser(lines()):
+            name = normalize_name(name, ecosystem)
+            if name in wanted:
+                if name in direct:
+                    continue
+                if _resolves_spec(wanted[name], version, ranges):
+                    resolved[name] = version
+                    direct.add(name)
+                    continue
+                current = resolved.get(name)
+                if current is None or _version_key(version) > _version_key(current):
+                    resolved[name] = version
+            elif len(resolved) == len(wanted):
+                break
+
+    if metrics is not None:
+        metrics.count('lockfiles_read')
+        metrics.count('bytes_read', bytes_read)
+    return resolved
+
+
+QUOTED_KEY = re.compile(r'"((?:[^"\\]|\\.)*)"\s*:')
+JSON_VERSION = re.compile(r'"version"\s*:\s*"([^"]*)"')
+
+
+def _read_package_lock(lines: Iterable[str]) -> LockRecords:
+    """package-lock.json/npm-shrinkwrap.json no formato do npm (uma chave por linha)
+
+    Só pacotes de primeiro nível: 'node_modules/<nome>' (lockfileVersion 2+)
+    ou as chaves de 'dependencies' (lockfileVersion 1).
+    """
+    keys: List[str] = []  # Chaves dos objetos/listas abertos
+    for line in lines:
+        text = line.strip()
+        if text.endswith(('{', '[')):
+            match = QUOTED_KEY.match(text)
+            keys.append(match.group(1) if match else '')
+        elif text.startswith(('}', ']')):
+            if keys:
+                keys.pop()
+        elif len(keys) == 3 and text.startswith('"version"'):
+            match = JSON_VERSION.match(text)
+            if not match:
+                continue
+            section, key = keys[1], keys[2]
+            if section == 'packages' and key.startswith('node_modules/') and '/node_modules/' not in key[12:]:
+                yield key[len('node_modules/'):], match.group(1), ()
+            elif section == 'dependencies':
+                yield key, match.group(1), ()
+
+
+def _read_yarn_lock(lines: Iterable[str]) -> LockRecords:
+    """yarn.lock clássico ('react@^18.2.0:' / 'version "18.2.0"') e Berry ('version: 18.2.0')"""
+    descriptors: List[Tuple[str, str]] = []
+    for line in lines:
+        if not line.strip() or line.startswith('#'):
+            continue
+        if not line[0].isspace():
+            descriptors = [_split_yarn_descriptor(descriptor) for descriptor in line.strip().rstrip(':').split(',')]
+            continue
+        match = re.match(r'\s+version:?\s+"?([^"\s]+)"?', line)
+        if match and descriptors:
+            for name in dict.fromkeys(name for name, _ in descriptors):
+                yield name, match.group(1), tuple(spec for other, spec in descriptors if other == name)
+            descriptors = []
+
+
+def _split_yarn_descriptor(descriptor: str) -> Tuple[str, str]:
+    """Nome e faixa de um descritor ('@scope/pkg@npm:^1.0' -> ('@scope/pkg', '^1.0'))"""
+    descriptor = descriptor.strip().strip('"')
+    index = descriptor.find('@', 1)
+    if index <= 0:
+        return descriptor, ''
+    spec = descriptor[index + 1:]
+    return descriptor[:index], spec[len('npm:'):] if spec.startswith('npm:') else spec
+
+
+def _read_toml_packages(lines: Iterable[str]) -> LockRecords:
+    """Tabelas [[package]] com name/version (poetry.lock, Cargo.lock)"""
+    name = None
+    for line in lines:
+        text = line.strip()
+        if text.startswith('['):
+            name = None
+        elif text.startswith('name ='):
+            name = _toml_value(text.split('=', 1)[1].strip())
+        elif text.startswith('version =') and name:
+            yield name, _toml_value(text.split('=', 1)[1].strip()), ()
+            name = None
+
+
+def _read_go_sum(lines: Iterable[str]) -> LockRecords:
+    """Linhas 'módulo versão[/go.mod] hash' do go.sum"""
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2:
+            version = parts[1]
+            yield parts[0], version[:-len('/go.mod')] if version.endswith('/go.mod') else version, ()
+
+
+def _resolves_spec(spec: Optional[str], version: str, ranges: Tuple[str, ...]) -> bool:
+    """Verificar se um registro de lockfile é o que resolve a faixa declarada na raiz"""
+    if not spec:
+        return False
+    spec = spec.strip()
+    return spec in ranges or spec.lstrip('=v ') == version.lstrip('v')
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    """Chave de ordenação numérica de uma versão ('v1.10.0' > 'v1.9.3')"""
+    return tuple(int(part) for part in re.findall(r'\d+', version))
+
+
+MANIFEST_PARSERS: List[Tuple[str, str, Callable[[str, str], Declared]]] = [
+    ('requirements*.txt', 'pypi', _parse_requirements),
+    ('pyproject.toml', 'pypi', _parse_pyproject),
+    ('Pipfile', 'pypi', _parse_pipfile),
+    ('setup.py', 'pypi', _parse_setup_py),
+    ('package.json', 'npm', _parse_package_json),
+    ('go.mod', 'go', _parse_go_mod),
+    ('Cargo.toml', 'cargo', _parse_cargo_toml),
+    ('pom.xml', 'maven', _parse_pom_xml),
+    ('build.gradle', 'maven', _parse_build_gradle),
+]
+
+LOCKFILE_PARSERS: List[Tuple[str, str, Callable[[Iterable[str]], LockRecords]]] = [
+    ('package-lock.json', 'npm', _read_package_lock),
+    ('npm-shrinkwrap.json', 'npm', _read_package_lock),
+    ('yarn.lock', 'npm', _read_yarn_lock),
+    ('poetry.lock', 'pypi', _read_toml_packages),
+    ('Cargo.lock', 'cargo', _read_toml_packages),
+    ('go.sum', 'go', _read_go_sum),
+]
@@ -6,14 +6,29 @@ Inspirado em: enterprise-project-model patterns
 """
 
 import os
+import sys
 import json
 import yaml
 import re
+import contextlib
+import cProfile
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass
 import argparse
 
+from project_scanner import (
+    DEFAULT_SKIP_DIRS, ContentScanPool, DetectionMetrics, EventEmitter, EvidenceSample, FileEntry,
+    FileInventory, ScanBudget, ScanCache, SubprojectResult, build_subproject_tree, decode_sample,
+    discover_subprojects, is_archive, result_to_dict, rules_fingerprint, scan_archive,
+    scan_git_revision, scan_project
+)
+from detection_rules import KeywordSet, RuleIndex, compile_keyword_tables, compile_rule_index
+
+# Bytes lidos (no máximo) de cada manifesto na busca por palavras-chave
+MANIFEST_READ_LIMIT = 1024 * 1024
+
+
 @dataclass
 class DetectionResult:
     """Resultado da detecção de linguagem e framework"""
@@ -21,9 +36,12 @@ class DetectionResult:
     confidence: float
     frameworks: List[str]
     package_managers: List[str]
-    evidence: Dict[str, List[str]]
+    evidence: Dict[str, Dict[str, Any]]  # files/extensions: {linguagem: {count, sample}}
     project_type: str
     suggested_structure: Dict[str, str]
+    partial: bool = False  # Prazo/orçamento esgotado antes de cobrir o projeto
+    coverage: float = 1.0  # Fração do projeto efetivamente analisada
+    metrics: Optional[Dict[str, Any]] = None  # Tempos por fase e contadores (--profile)
 
 class LanguageDetector:
     """Sistema inteligente de detecção de linguagem e framework"""
@@ -122,25 +140,87 @@ class LanguageDetector:
             'files': ['__init__.py', 'lib.rs', 'index.js']
         }
     }
+    
+    # Arquivos que indicam cada gerenciador de pacotes
+    PACKAGE_MANAGER_FILES = {
+        'npm': ['package.json', 'package-lock.json'],
+        'yarn': ['yarn.lock'],
+        'pip': ['requirements.txt', 'setup.py'],
+        'poetry': ['pyproject.toml', 'poetry.lock'],
+        'pipenv': ['Pipfile', 'Pipfile.lock'],
+        'cargo': ['Cargo.toml', 'Cargo.lock'],
+        'go_modules': ['go.mod', 'go.sum'],
+        'maven': ['pom.xml'],
+        'gradle': ['build.gradle', 'gradle.properties'],
+        'nuget': ['*.csproj', '*.sln']
+    }
+    
+    # Tabelas acima compiladas no primeiro uso de rule_index()
+    _rule_index: Optional[RuleIndex] = None
 
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, inventory: Optional[FileInventory] = None,
+                 skip_dirs: Optional[Iterable[str]] = None, use_ignore_files: bool = True,
+                 cache: Optional[ScanCache] = None, workers: Optional[int] = None,
+                 use_processes: bool = False, quiet: bool = False,
+                 backend: str = 'auto', rev: Optional[str] = None,
+                 events: Optional[EventEmitter] = None, metrics: Optional[DetectionMetrics] = None):
         """Inicializar detector para um projeto específico"""
+        # Arquivo .zip/.tar (ou '-' para stdin) é lido sem extração
+        self.archive = project_path if inventory is None and is_archive(project_path) else None
         self.project_path = Path(project_path).resolve()
+        self.inventory = inventory
+        self.skip_dirs = skip_dirs
+        self.use_ignore_files = use_ignore_files
+        self.cache = cache
+        self.workers = workers
+        self.use_processes = use_processes
+        self.quiet = quiet
+        self.backend = backend
+        self.rev = rev
+        self.events = events
+        self.metrics = metrics
         self.evidence = {}
+        self._matches: Dict[Tuple[str, str, str], List[FileEntry]] = {}
+        self.budget: Optional[ScanBudget] = None
+        self._content_coverage = 1.0
+        
+    def detect(self, budget: Optional[ScanBudget] = None) -> DetectionResult:
+        """Executar detecção completa
         
-    def detect(self) -> DetectionResult:
-        """Executar detecção completa"""
-        print(f"🔍 Analisando projeto: {self.project_path}")
+        Com `budget` (prazo e limites de arquivos/bytes), a detecção para ao
+        esgotá-lo e devolve o melhor resultado até ali, com `partial` e só a
+        parte da confiança que vem do conteúdo proporcional à cobertura.
+        """
+        self.budget = budget
+        self._content_coverage = 1.0
+        if not self.quiet:
+            print(f"🔍 Analisando projeto: {self.archive or self.project_path}")
+        
+        # Uma única travessia alimenta todas as fases
+        with self._phase('inventory'):
+            self._ensure_inventory()
+        if self.events is not None:
+            self.events.emit('inventory', files=len(self.inventory), directories=len(self.inventory.directories),
+                             coverage=self.inventory.coverage)
+        
+        # Cada nome de arquivo é classificado uma vez contra todas as tabelas de regras
+        with self._phase('classify'):
+            self._matches = self.rule_index().match(self.inventory)
         
         # Coletar evidências
-        file_evidence = self._detect_by_files()
-        extension_evidence = self._detect_by_extensions()
-        content_evidence = self._detect_by_content()
-        structure_evidence = self._detect_project_type()
+        with self._phase('files'):
+            file_evidence = self._detect_by_files()
+        with self._phase('extensions'):
+            extension_evidence = self._detect_by_extensions()
+        with self._phase('content'):
+            content_evidence = self._detect_by_content()
+        with self._phase('project_type'):
+            structure_evidence = self._detect_project_type()
         
         # Combinar evidências e calcular scores
+        coverage = self.inventory.coverage * self._content_coverage
         language_scores = self._calculate_language_scores(
-            file_evidence, extension_evidence, content_evidence
+            file_evidence, extension_evidence, content_evidence, coverage
         )
         
         # Determinar linguagem principal
@@ -148,14 +228,24 @@ class LanguageDetector:
         confidence = language_scores[primary_language]
         
         # Detectar frameworks
-        frameworks = self._detect_frameworks(primary_language, content_evidence)
+        with self._phase('frameworks'):
+            frameworks = self._detect_frameworks(primary_language, content_evidence)
+        if self.events is not None:
+            for framework in frameworks:
+                self.events.emit('framework', language=primary_language, name=framework)
         
         # Detectar gerenciadores de pacote
-        package_managers = self._detect_package_managers(primary_language)
+        with self._phase('package_managers'):
+            package_managers = self._detect_package_managers(primary_language)
         
         # Sugerir estrutura
         suggested_structure = self._suggest_structure(primary_language, structure_evidence)
         
+        if self.cache is not None:
+            self.cache.save()
+        
+        partial = coverage < 1.0 or (budget is not None and budget.exhausted)
+        
         return DetectionResult(
             primary_language=primary_language,
             confidence=confidence,
@@ -163,28 +253,124 @@ class LanguageDetector:
             package_managers=package_managers,
             evidence=self.evidence,
             project_type=structure_evidence,
-            suggested_structure=suggested_structure
+            suggested_structure=suggested_structure,
+            partial=partial,
+            coverage=coverage,
+            metrics=self._collect_metrics()
         )
     
+    def detect_subprojects(self) -> SubprojectResult:
+        """Detectar cada sub-projeto de um monorepo a partir de uma única travessia"""
+        if not self.quiet:
+            print(f"🔍 Analisando monorepo: {self.project_path}")
+        
+        self._ensure_inventory()
+        prefixes = discover_subprojects(self.inventory)
+        views = self.inventory.partition(prefixes)
+        jobs = [(str(self.project_path), self.inventory)] + [
+            (str(self.project_path / prefix), views[prefix]) for prefix in prefixes
+        ]
+        
+        # Sub-projetos em paralelo; cada detecção interna é serial
+        with ContentScanPool(self.workers, self.use_processes) as pool:
+            results = pool.map(_detect_subproject, jobs)
+        
+        if self.cache is not None:
+            self.cache.save()
+        
+        return build_subproject_tree(dict(zip([''] + prefixes, results)))
+    
+    def _ensure_inventory(self):
+        """Montar o inventário com uma única travessia, se ainda não fornecido"""
+        if self.inventory is None and self.rev:
+            self.inventory = scan_git_revision(self.project_path, self.rev, self.skip_dirs)
+        elif self.inventory is None and self.archive:
+            self.inventory = scan_archive(self.archive, self.skip_dirs, wanted=self.wants_member)
+        elif self.inventory is None:
+            self.inventory = scan_project(
+                self.project_path, skip_dirs=self.skip_dirs,
+                use_ignore_files=self.use_ignore_files, cache=self.cache, backend=self.backend,
+                budget=self.budget, events=self.events, metrics=self.metrics
+            )
+    
+    def _phase(self, name: str):
+        """Contexto de uma fase de detecção (eventos e métricas, se habilitados)"""
+        stack = contextlib.ExitStack()
+        if self.events is not None:
+            stack.enter_context(self.events.phase(name))
+        if self.metrics is not None:
+            stack.enter_context(self.metrics.phase(name))
+        return stack
+    
+    def _collect_metrics(self) -> Optional[Dict[str, Any]]:
+        """Métricas da execução com os totais do inventário e do cache, ou None se desabilitadas"""
+        if self.metrics is None:
+            return None
+        self.metrics.counters['files_visited'] = len(self.inventory)
+        self.metrics.counters['directories_visited'] = len(self.inventory.directories)
+        if self.cache is not None:
+            self.metrics.counters['cache_hits'] = self.cache.hits
+            self.metrics.counters['cache_misses'] = self.cache.misses
+        return self.metrics.as_dict()
+    
+    @classmethod
+    def rule_index(cls) -> RuleIndex:
+        """FILE_PATTERNS, PROJECT_TYPES e PACKAGE_MANAGER_FILES compilados em um RuleIndex
+        
+        Compilado uma vez por classe: wants_member consulta o índice a cada
+        membro de arquivo compactado. Subclasses com outras tabelas compilam
+        o seu próprio.
+        """
+        index = cls.__dict__.get('_rule_index')
+        if index is not None:
+            return index
+        rules = [
+            ('files', language, pattern)
+            for language, config in cls.FILE_PATTERNS.items() for pattern in config['files']
+        ] + [
+            ('project_type', project_type, pattern)
+            for project_type, config in cls.PROJECT_TYPES.items() for pattern in config['files']
+        ] + [
+            ('package_manager', manager, pattern)
+            for manager, patterns in cls.PACKAGE_MANAGER_FILES.items() for pattern in patterns
+        ]
+        extension_rules = [
+            ('extensions', language, extension)
+            for language, config in cls.FILE_PATTERNS.items() for extension in config['extensions']
+        ]
+        cls._rule_index = compile_rule_index(rules, extension_rules)
+        return cls._rule_index
+    
+    @classmethod
+    def wants_member(cls, path: str) -> bool:
+        """Membros de arquivo compactado cujo conteúdo a detecção pode ler"""
+        return any(rule[0] == 'files' for rule in cls.rule_index().classify(path.rsplit('/', 1)[-1]))
+    
     def _detect_by_files(self) -> Dict[str, float]:
         """Detectar linguagem baseado em arquivos específicos"""
         scores = {}
         file_evidence = {}
         
         for language, config in self.FILE_PATTERNS.items():
-            found_files = []
+            # Contagem exata e poucos exemplos: tamanho constante mesmo com milhares de manifestos
+            found_files = EvidenceSample()
             score = 0.0
             
             for file_pattern in config['files']:
-                matches = list(self.project_path.glob(f"**/{file_pattern}"))
+                matches = self._matches.get(('files', language, file_pattern))
                 if matches:
-                    found_files.extend([str(m.relative_to(self.project_path)) for m in matches])
+                    found_files.extend(m.path for m in matches)
                     # Peso maior para arquivos na raiz
-                    root_matches = [m for m in matches if m.parent == self.project_path]
-                    score += len(root_matches) * 0.8 + len(matches) * 0.5
+                    root_matches = sum(1 for m in matches if m.depth == 0)
+                    score += root_matches * 0.8 + len(matches) * 0.5
+                    if self.events is not None:
+                        example = EvidenceSample()
+                        example.extend(m.path for m in matches)
+                        self.events.emit('file_match', language=language, pattern=file_pattern,
+                                         count=example.count, files=example.sample)
             
             scores[language] = score
-            file_evidence[language] = found_files
+            file_evidence[language] = found_files.as_dict()
         
         self.evidence['files'] = file_evidence
         return scores
@@ -195,61 +381,119 @@ class LanguageDetector:
         extension_evidence = {}
         
         for language, config in self.FILE_PATTERNS.items():
-            file_count = 0
-            found_files = []
+            found_files = EvidenceSample()
             
             for ext in config['extensions']:
-                matches = list(self.project_path.glob(f"**/*{ext}"))
                 # Filtrar arquivos muito grandes ou em diretórios irrelevantes
-                filtered_matches = [
-                    m for m in matches 
-                    if m.stat().st_size < 1024*1024  # < 1MB
-                    and not any(part.startswith('.') for part in m.parts)  # Não em pastas ocultas
-                    and 'node_modules' not in str(m)
-                    and '__pycache__' not in str(m)
-                ]
-                
-                file_count += len(filtered_matches)
-                found_files.extend([str(m.relative_to(self.project_path)) for m in filtered_matches[:10]])
+                found_files.extend(
+                    m.path for m in self._matches.get(('extensions', language, ext), ()) if self._is_relevant_source(m)
+                )
             
-            scores[language] = file_count * 0.1  # Peso menor que arquivos específicos
-            extension_evidence[language] = found_files
+            scores[language] = found_files.count * 0.1  # Peso menor que arquivos específicos
+            extension_evidence[language] = found_files.as_dict()
         
         self.evidence['extensions'] = extension_evidence
         return scores
     
+    def _is_relevant_source(self, entry: FileEntry) -> bool:
+        """Verificar se o arquivo deve contar como código-fonte do projeto"""
+        # node_modules, __pycache__ etc. já foram podados na travessia
+        return (
+            entry.size < 1024*1024  # < 1MB
+            and not any(part.startswith('.') for part in entry.path.split('/'))  # Não em pastas ocultas
+        )
+    
     def _detect_by_content(self) -> Dict[str, Dict[str, List[str]]]:
         """Detectar frameworks baseado no conteúdo dos arquivos"""
-        content_evidence = {}
+        content_evidence = {language: {} for language in self.FILE_PATTERNS}
         
+        # Analisar arquivos de configuração específicos
+        jobs = []
         for language, config in self.FILE_PATTERNS.items():
-            content_evidence[language] = {}
-            
-            # Analisar arquivos de configuração específicos
             for file_pattern in config['files']:
-                matches = list(self.project_path.glob(f"**/{file_pattern}"))
-                for match in matches[:5]:  # Limitar análise
-                    try:
-                        content = match.read_text(encoding='utf-8')
-                        
-                        # Procurar por frameworks específicos
-                        for framework, keywords in config['frameworks'].items():
-                            found_keywords = []
-                            for keyword in keywords:
-                                if keyword in content:
-                                    found_keywords.append(keyword)
-                            
-                            if found_keywords:
-                                if framework not in content_evidence[language]:
-                                    content_evidence[language][framework] = []
-                                content_evidence[language][framework].extend(found_keywords)
-                    
-                    except (UnicodeDecodeError, PermissionError):
-                        continue
+                for match in self._matches.get(('files', language, file_pattern), [])[:5]:  # Limitar análise
+                    jobs.append((language, match))
+        
+        # Cada arquivo é lido e varrido uma única vez, mesmo se compartilhado entre linguagens
+        unique_entries = list({entry.path: entry for _, entry in jobs}.values())
+        found_by_path = dict(zip(
+            (entry.path for entry in unique_entries), self._scan_keywords(unique_entries)
+        ))
+        
+        if self.events is not None:
+            for path, found in found_by_path.items():
+                if found:
+                    self.events.emit('keyword_hit', path=path, keywords=found)
+        
+        for language, entry in jobs:
+            found = found_by_path[entry.path]
+            if found is None:
+                continue
+            
+            # Procurar por frameworks específicos
+            for framework, keywords in self.FILE_PATTERNS[language]['frameworks'].items():
+                found_keywords = [keyword for keyword in keywords if keyword in found]
+                if found_keywords:
+                    if framework not in content_evidence[language]:
+                        content_evidence[language][framework] = []
+                    content_evidence[language][framework].extend(found_keywords)
         
         self.evidence['content'] = content_evidence
         return content_evidence
     
+    def _scan_keywords(self, entries: List[FileEntry]) -> List[Optional[List[str]]]:
+        """Palavras-chave presentes em cada arquivo; o cache é consultado antes de ler"""
+        tables = {language: config['frameworks'] for language, config in self.FILE_PATTERNS.items()}
+        keyword_set = compile_keyword_tables(tables)
+        fingerprint = rules_fingerprint(tables)
+        results: List[Optional[List[str]]] = [None] * len(entries)
+        pending = []
+        
+        reader = self.inventory.reader
+        for index, entry in enumerate(entries):
+            # Sem metadados (ex: revisão git) não há como validar o cache
+            st = reader.stat(entry.path) if self.cache is not None else None
+            if self.cache is not None and self.metrics is not None:
+                self.metrics.count('files_stated')
+            if st is not None:
+                cached = self.cache.lookup_file("content", fingerprint, entry.path, st)
+                if cached is not None:
+                    results[index] = cached
+                    continue
+            pending.append((index, st))
+        
+        if self.budget is not None:
+            # Manifestos rasos (raiz do projeto) primeiro: maior sinal por byte lido
+            pending.sort(key=lambda item: (entries[item[0]].depth, entries[item[0]].path))
+        
+        batch_size = 4 * (self.workers or os.cpu_count() or 1)
+        scanned_count = 0
+        with ContentScanPool(self.workers, self.use_processes) as pool:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                if self.budget is not None:
+                    admitted = self.budget.admit([entries[index] for index, _ in batch], MANIFEST_READ_LIMIT)
+                    batch = batch[:len(admitted)]
+                
+                scanned = pool.map(_keyword_hits, [
+                    (reader, entries[index].path, keyword_set) for index, _ in batch
+                ])
+                for (index, st), (found, bytes_read) in zip(batch, scanned):
+                    results[index] = found
+                    if self.metrics is not None:
+                        self.metrics.count('files_read')
+                        self.metrics.count('bytes_read', bytes_read)
+                    if st is not None and found is not None:
+                        self.cache.store_file("content", fingerprint, entries[index].path, st, found)
+                
+                scanned_count += len(batch)
+                if self.budget is not None and self.budget.exhausted:
+                    break
+        
+        if pending:
+            self._content_coverage = (len(entries) - len(pending) + scanned_count) / len(entries)
+        return results
+    
     def _detect_project_type(self) -> str:
         """Detectar tipo de projeto baseado na estrutura"""
         type_scores = {}
@@ -259,12 +503,12 @@ class LanguageDetector:
             
             # Verificar padrões de diretório
             for pattern in config['patterns']:
-                matches = list(self.project_path.glob(f"**/{pattern}"))
+                matches = self.inventory.match_directories(pattern)
                 score += len(matches) * 2.0
             
             # Verificar arquivos específicos
             for file_pattern in config['files']:
-                matches = list(self.project_path.glob(f"**/{file_pattern}"))
+                matches = self._matches.get(('project_type', project_type, file_pattern), ())
                 score += len(matches) * 1.5
             
             type_scores[project_type] = score
@@ -274,8 +518,13 @@ class LanguageDetector:
         
         return max(type_scores.items(), key=lambda x: x[1])[0]
     
-    def _calculate_language_scores(self, file_evidence: Dict, extension_evidence: Dict, content_evidence: Dict) -> Dict[str, float]:
-        """Calcular scores finais combinando todas as evidências"""
+    def _calculate_language_scores(self, file_evidence: Dict, extension_evidence: Dict, content_evidence: Dict,
+                                   content_coverage: float = 1.0) -> Dict[str, float]:
+        """Calcular scores finais combinando todas as evidências
+        
+        Só o peso do conteúdo é proporcional a `content_coverage`: arquivos e
+        extensões vêm do inventário, não da leitura de código.
+        """
         final_scores = {}
         
         for language in self.FILE_PATTERNS.keys():
@@ -289,7 +538,7 @@ class LanguageDetector:
             
             # Peso do conteúdo (frameworks encontrados)
             framework_count = len(content_evidence.get(language, {}))
-            score += framework_count * 2.0
+            score += framework_count * 2.0 * content_coverage
             
             # Normalizar score
             final_scores[language] = min(score / 10.0, 1.0)
@@ -311,24 +560,9 @@ class LanguageDetector:
         """Detectar gerenciadores de pacote baseado na linguagem e arquivos"""
         managers = []
         
-        manager_files = {
-            'npm': ['package.json', 'package-lock.json'],
-            'yarn': ['yarn.lock'],
-            'pip': ['requirements.txt', 'setup.py'],
-            'poetry': ['pyproject.toml', 'poetry.lock'],
-            'pipenv': ['Pipfile', 'Pipfile.lock'],
-            'cargo': ['Cargo.toml', 'Cargo.lock'],
-            'go_modules': ['go.mod', 'go.sum'],
-            'maven': ['pom.xml'],
-            'gradle': ['build.gradle', 'gradle.properties'],
-            'nuget': ['*.csproj', '*.sln']
-        }
-        
-        for manager, files in manager_files.items():
-            for file_pattern in files:
-                if list(self.project_path.glob(f"**/{file_pattern}")):
-                    managers.append(manager)
-                    break
+        for manager, files in self.PACKAGE_MANAGER_FILES.items():
+            if any(('package_manager', manager, file_pattern) in self._matches for file_pattern in files):
+                managers.append(manager)
         
         return managers
     
@@ -357,31 +591,150 @@ class LanguageDetector:
         
         return structures.get(language, {}).get(project_type, 'src/, tests/, docs/')
 
+def _keyword_hits(job: Tuple[Any, str, KeywordSet]) -> Tuple[Optional[List[str]], int]:
+    """Palavras-chave presentes em um arquivo, com uma única leitura (executado no pool)
+    
+    Retorna também o número de bytes lidos.
+    """
+    reader, rel_path, keyword_set = job
+    try:
+        raw = reader.read_bytes(rel_path, MANIFEST_READ_LIMIT)
+    except OSError:
+        return None, 0
+    content = decode_sample(raw, truncated=len(raw) >= MANIFEST_READ_LIMIT)
+    if content is None:
+        return None, len(raw)
+    return sorted(keyword_set.find_all(content)), len(raw)
+
+def _detect_subproject(job: Tuple[str, FileInventory]) -> DetectionResult:
+    """Detectar um sub-projeto sobre sua visão do inventário (executado no pool)"""
+    project_path, inventory = job
+    return LanguageDetector(project_path, inventory=inventory, workers=1, quiet=True).detect()
+
+def _print_metrics(metrics: Dict[str, Any]):
+    """Imprimir métricas por fase e contadores em formato texto"""
+    print(f"\n⏱️  **Métricas:**")
+    for name, totals in metrics['phases'].items():
+        print(f"   • {name}: {totals['wall_seconds'] * 1000:.1f} ms (CPU {totals['cpu_seconds'] * 1000:.1f} ms)")
+    for name, value in metrics['counters'].items():
+        print(f"   • {name}: {value}")
+
+def _print_subproject_tree(node: SubprojectResult, indent: int = 0):
+    """Imprimir árvore de sub-projetos em formato texto"""
+    result = node.result
+    frameworks = ', '.join(result.frameworks) if result.frameworks else '-'
+    print(f"{'   ' * indent}📦 {node.path or '.'}: {result.primary_language} "
+          f"({result.confidence:.1%}) | frameworks: {frameworks} | tipo: {result.project_type}")
+    for child in node.subprojects:
+        _print_subproject_tree(child, indent + 1)
+
 def main():
     """CLI para detecção de linguagem"""
     parser = argparse.ArgumentParser(description='AI Project Template - Language Detection')
-    parser.add_argument('project_path', help='Caminho para o projeto a ser analisado')
+    parser.add_argument('project_path',
+                        help='Caminho para o projeto a ser analisado (diretório, .zip/.tar ou - para stdin)')
     parser.add_argument('--output', '-o', choices=['json', 'yaml', 'text'], default='text',
                         help='Formato de saída')
     parser.add_argument('--verbose', '-v', action='store_true',
                         help='Output detalhado com evidências')
+    parser.add_argument('--skip-dir', action='append', default=[], metavar='NOME',
+                        help='Diretório adicional a ignorar na travessia (pode repetir)')
+    parser.add_argument('--no-ignore', action='store_true',
+                        help='Não respeitar .gitignore/.ignore do projeto')
+    parser.add_argument('--cache', nargs='?', const='auto', metavar='ARQUIVO',
+                        help='Reaproveitar travessia/evidências da execução anterior '
+                             '(padrão: cache no diretório temporário)')
+    parser.add_argument('--workers', '-j', type=int, metavar='N',
+                        help='Número de workers para leitura de conteúdo (1 = serial)')
+    parser.add_argument('--processes', action='store_true',
+                        help='Usar pool de processos em vez de threads na busca de conteúdo')
+    parser.add_argument('--backend', choices=['auto', 'walk'], default='auto',
+                        help='Enumeração de arquivos: auto = índice do git em work trees, '
+                             'walk = sempre percorrer o disco')
+    parser.add_argument('--rev', metavar='REVISÃO',
+                        help='Analisar uma revisão git (commit, tag, branch) sem checkout')
+    parser.add_argument('--monorepo', action='store_true',
+                        help='Detectar cada sub-projeto (package.json, pyproject.toml, go.mod...) separadamente')
+    parser.add_argument('--deadline', type=float, metavar='SEGUNDOS',
+                        help='Prazo da detecção; ao esgotar, devolve resultado parcial')
+    parser.add_argument('--max-files', type=int, metavar='N',
+                        help='Máximo de arquivos com conteúdo lido')
+    parser.add_argument('--max-bytes', type=int, metavar='N',
+                        help='Máximo de bytes de conteúdo lidos')
+    parser.add_argument('--events', choices=['ndjson'],
+                        help='Emitir eventos de progresso/evidência em stdout durante a detecção '
+                             '(o resultado final vem no evento "result")')
+    parser.add_argument('--profile', nargs='?', const='', metavar='ARQUIVO.pstats',
+                        help='Incluir métricas por fase no resultado; com ARQUIVO, salvar também '
+                             'o perfil cProfile (pstats)')
     
     args = parser.parse_args()
     
     # Verificar se o caminho existe
-    if not os.path.exists(args.project_path):
+    if args.project_path != '-' and not os.path.exists(args.project_path):
         print(f"❌ Erro: Caminho '{args.project_path}' não encontrado")
         return 1
     
     # Executar detecção
-    detector = LanguageDetector(args.project_path)
-    result = detector.detect()
+    cache = None
+    if args.cache:
+        cache = ScanCache.for_project(args.project_path) if args.cache == 'auto' else ScanCache(args.cache)
+    
+    detector = LanguageDetector(
+        args.project_path,
+        skip_dirs=DEFAULT_SKIP_DIRS | set(args.skip_dir),
+        use_ignore_files=not args.no_ignore,
+        cache=cache,
+        workers=args.workers,
+        use_processes=args.processes,
+        backend=args.backend,
+        rev=args.rev,
+        quiet=bool(args.events) or args.output != 'text',  # JSON/YAML puros em stdout
+        events=EventEmitter() if args.events else None,
+        metrics=DetectionMetrics() if args.profile is not None else None
+    )
+    if args.rev:
+        # Validar a revisão antes de iniciar a detecção
+        try:
+            detector.inventory = scan_git_revision(detector.project_path, args.rev, detector.skip_dirs)
+        except ValueError as e:
+            print(f"❌ Erro: {e}")
+            return 1
+    
+    if args.monorepo:
+        tree = detector.detect_subprojects()
+        if args.events:
+            detector.events.emit('result', result=result_to_dict(tree))
+        elif args.output == 'json':
+            print(json.dumps(result_to_dict(tree), indent=2, ensure_ascii=False))
+        elif args.output == 'yaml':
+            print(yaml.dump(result_to_dict(tree), default_flow_style=False, allow_unicode=True))
+        else:
+            print(f"\n🎯 **Sub-projetos detectados:**")
+            _print_subproject_tree(tree)
+        return 0
+    
+    budget = None
+    if args.deadline is not None or args.max_files is not None or args.max_bytes is not None:
+        budget = ScanBudget(args.deadline, args.max_files, args.max_bytes)
+    
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    
+    result = detector.detect(budget)
+    
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
     
     # Output baseado no formato escolhido
-    if args.output == 'json':
-        print(json.dumps(asdict(result), indent=2, ensure_ascii=False))
+    if args.events:
+        detector.events.emit('result', result=result_to_dict(result))
+    elif args.output == 'json':
+        print(json.dumps(result_to_dict(result), indent=2, ensure_ascii=False))
     elif args.output == 'yaml':
-        print(yaml.dump(asdict(result), default_flow_style=False, allow_unicode=True))
+        print(yaml.dump(result_to_dict(result), default_flow_style=False, allow_unicode=True))
     else:
         # Formato texto amigável
         print(f"\n🎯 **Resultado da Detecção:**")
@@ -392,14 +745,26 @@ def main():
         print(f"   📦 Gerenciadores: {', '.join(result.package_managers) if result.package_managers else 'Nenhum detectado'}")
         print(f"   🏗️  Tipo: {result.project_type}")
         print(f"   📁 Estrutura sugerida: {result.suggested_structure}")
+        if result.partial:
+            print(f"   ⚠️  Resultado parcial: {result.coverage:.1%} do projeto analisado")
         
         if args.verbose and result.evidence:
             print(f"\n📋 **Evidências encontradas:**")
             for category, evidence in result.evidence.items():
                 print(f"   {category.upper()}:")
                 for lang, items in evidence.items():
-                    if items:
-                        print(f"     {lang}: {items[:3]}{'...' if len(items) > 3 else ''}")
+                    if category in ('files', 'extensions'):
+                        if items['count']:
+                            more = '...' if items['count'] > 3 else ''
+                            print(f"     {lang}: {items['count']} arquivo(s), ex: {items['sample'][:3]}{more}")
+                    elif items:
+                        print(f"     {lang}: {items}")
+        
+        if result.metrics:
+            _print_metrics(result.metrics)
+    
+    if args.profile:
+        print(f"📈 Perfil cProfile salvo em: {args.profile}", file=sys.stderr)
     
     return 0
 
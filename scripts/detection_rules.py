@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+AI Project Template - Detection Rules
+Compilação das tabelas de regras dos detectores em estruturas de busca
+eficientes, construídas uma única vez e reutilizadas em todos os arquivos.
+"""
+
+import os
+import re
+import fnmatch
+import functools
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from project_scanner import FileEntry, FileInventory, decode_sample, rules_fingerprint
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+# Literais menores que isso filtram pouco e não compensam a verificação
+MIN_LITERAL_LENGTH = 2
+
+# Padrões de import/require só são procurados no início do arquivo
+HEADER_READ_LIMIT = 64 * 1024
+HEADER_PATTERN = re.compile(r'^(import|from|require)\b')
+
+
+class KeywordSet:
+    """Palavras-chave buscadas como substrings, com a busca de substring do próprio Python (em C)
+
+    A semântica é a de `keyword in content` (exata, sensível a maiúsculas).
+    Palavras que contêm outra (ex: 'next.config.js' contém 'next') só são
+    procuradas se a menor estiver presente: em arquivos sem nenhuma
+    ocorrência, boa parte das buscas é evitada.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """Ordenar por tamanho e ligar cada palavra à maior palavra contida nela"""
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(k for k in keywords if k))
+        ordered = sorted(self.keywords, key=len)
+        self._searches: List[Tuple[str, Optional[str]]] = []  # (palavra, palavra exigida antes)
+        for position, keyword in enumerate(ordered):
+            contained = [other for other in ordered[:position] if other in keyword]
+            self._searches.append((keyword, max(contained, key=len) if contained else None))
+
+    def find_all(self, text: str) -> Set[str]:
+        """Palavras-chave presentes no texto"""
+        found: Set[str] = set()
+        for keyword, required in self._searches:
+            if (required is None or required in found) and keyword in text:
+                found.add(keyword)
+        return found
+
+
+_KEYWORD_CACHE: Dict[str, KeywordSet] = {}
+
+
+def compile_keyword_tables(tables: Dict[str, Dict[str, List[str]]]) -> KeywordSet:
+    """Compilar tabelas {linguagem: {framework: [palavras]}} em um único KeywordSet
+
+    O conjunto é reaproveitado enquanto as tabelas não mudam.
+    """
+    fingerprint = rules_fingerprint(tables)
+    keyword_set = _KEYWORD_CACHE.get(fingerprint)
+    if keyword_set is None:
+        keyword_set = KeywordSet(
+            keyword
+            for frameworks in tables.values()
+            for keywords in frameworks.values()
+            for keyword in keywords
+        )
+        _KEYWORD_CACHE[fingerprint] = keyword_set
+    return keyword_set
+
+
+class PatternSet:
+    """Regex de várias regras fundidas em uma expressão com grupos nomeados
+
+    Cada padrão vira um lookahead `(?=(?P<pN>...))`, então padrões que se
+    sobrepõem não se escondem. A busca avança de ocorrência em ocorrência e
+    remove da expressão os padrões já encontrados: no máximo N+1 buscas em C
+    por arquivo, em vez de uma leitura e uma busca por padrão.
+
+    Antes da regex, `search_bytes` aplica um pré-filtro: cada padrão só é
+    avaliado se todos os seus literais obrigatórios aparecem no conteúdo.
+    Cada padrão tem um limite de leitura (`limits`, None = arquivo inteiro):
+    só os primeiros bytes do arquivo são lidos e avaliados para ele.
+    """
+
+    def __init__(self, patterns: Iterable[str], flags: int = re.IGNORECASE | re.MULTILINE,
+                 limits: Optional[Dict[str, Optional[int]]] = None):
+        self.patterns: Tuple[str, ...] = tuple(dict.fromkeys(patterns))
+        self.flags = flags
+        self._ids = {pattern: index for index, pattern in enumerate(self.patterns)}
+        self.limits: Tuple[Optional[int], ...] = tuple(
+            (limits or {}).get(pattern) for pattern in self.patterns
+        )
+        self.literals: Tuple[Tuple[bytes, ...], ...] = tuple(
+            required_literals(pattern, flags) for pattern in self.patterns
+        )
+
+    def __getstate__(self):
+        # Expressões compiladas ficam fora do pickle (enviado ao pool de processos)
+        return {'patterns': self.patterns, 'flags': self.flags,
+                'limits': dict(zip(self.patterns, self.limits))}
+
+    def __setstate__(self, state):
+        self.__init__(state['patterns'], state['flags'], state['limits'])
+
+    def index(self, pattern: str) -> int:
+        """Identificador numérico de um padrão"""
+        return self._ids[pattern]
+
+    def search_all(self, text: str, ids: Optional[Iterable[int]] = None,
+                   stats: Optional[Dict[str, int]] = None) -> Set[int]:
+        """Identificadores dos padrões (todos ou só `ids`) que ocorrem no texto
+
+        Com `stats`, o número de buscas em regex é somado em 'regex_evaluations'.
+        """
+        remaining = tuple(sorted(self._ids.values() if ids is None else ids))
+        found: Set[int] = set()
+        position = 0
+
+        while remaining:
+            if stats is not None:
+                stats['regex_evaluations'] = stats.get('regex_evaluations', 0) + 1
+            match = self._fused(remaining).search(text, position)
+            if match is None:
+                break
+            # Posições anteriores não casam nenhum padrão restante: continuar daqui
+            pattern_id = int(match.lastgroup[1:])
+            found.add(pattern_id)
+            remaining = tuple(i for i in remaining if i != pattern_id)
+            position = match.start()
+
+        return found
+
+    def candidates(self, lowered: bytes, ids: Optional[Iterable[int]] = None,
+                   end: Optional[int] = None) -> List[int]:
+        """Padrões cujos literais obrigatórios aparecem no conteúdo (já em minúsculas)"""
+        ids = self._ids.values() if ids is None else ids
+        end = len(lowered) if end is None else end
+        return [i for i in ids if all(lowered.find(literal, 0, end) >= 0 for literal in self.literals[i])]
+
+    def read_limit(self, ids: Optional[Iterable[int]] = None) -> Optional[int]:
+        """Bytes que precisam ser lidos para avaliar os padrões (None = arquivo inteiro)"""
+        limits = [self.limits[i] for i in (self._ids.values() if ids is None else ids)]
+        return None if not limits or None in limits else max(limits)
+
+    def search_bytes(self, raw: bytes, ids: Optional[Iterable[int]] = None,
+                     truncated: bool = False, stats: Optional[Dict[str, int]] = None) -> Set[int]:
+        """Como `search_all`, mas sobre bytes: decodifica só se o pré-filtro passar
+
+        `truncated` indica que `raw` é só o início do arquivo (leitura limitada).
+        Conteúdo binário ou que não é UTF-8 não casa nenhum padrão.
+        """
+        ids = tuple(self._ids.values() if ids is None else ids)
+        # Fora do ASCII a equivalência de maiúsculas da regex não é a de bytes.lower()
+        prefilter = raw.isascii()
+        lowered = raw.lower() if prefilter and self.flags & re.IGNORECASE else raw
+
+        # Padrões agrupados pelo trecho inicial que lhes cabe avaliar
+        groups: Dict[int, List[int]] = {}
+        for i in ids:
+            limit = self.limits[i]
+            groups.setdefault(len(raw) if limit is None else min(limit, len(raw)), []).append(i)
+
+        found: Set[int] = set()
+        for end, group in sorted(groups.items()):
+            if prefilter:
+                group = self.candidates(lowered, group, end)
+                if not group:
+                    continue
+            text = decode_sample(raw[:end] if end < len(raw) else raw, truncated or end < len(raw))
+            if text is None:
+                return set()
+            found |= self.search_all(text, group, stats)
+        return found
+
+    @functools.lru_cache(maxsize=256)
+    def _fused(self, ids: Tuple[int, ...]) -> re.Pattern:
+        """Expressão combinada para um subconjunto de padrões"""
+        return re.compile(
+            '|'.join(f'(?=(?P<p{i}>{self.patterns[i]}))' for i in ids),
+            self.flags
+        )
+
+
+def required_literals(pattern: str, flags: int = 0) -> Tuple[bytes, ...]:
+    """Literais que toda ocorrência do padrão precisa conter
+
+    Percorre a árvore do parser de regex coletando sequências contíguas de
+    literais no nível obrigatório (fora de alternativas, classes e
+    repetições opcionais). Sem literais úteis, o padrão não é pré-filtrado.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return ()
+
+    runs: List[str] = []
+    current: List[str] = []
+
+    def flush():
+        if current:
+            runs.append(''.join(current))
+            current.clear()
+
+    def walk(items):
+        for op, av in items:
+            if op is sre_parse.LITERAL:
+                current.append(chr(av))
+            elif op is sre_parse.SUBPATTERN:
+                # (group, add_flags, del_flags, conteúdo): grupo sem alternativa é obrigatório
+                walk(av[-1])
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+                flush()
+                if av[0] >= 1:
+                    walk(av[2])
+                    flush()
+            elif op is sre_parse.AT:
+                continue  # Âncoras não consomem caracteres
+            else:
+                flush()
+
+    walk(parsed)
+    flush()
+
+    if flags & re.IGNORECASE:
+        runs = [run.lower() for run in runs]
+    return tuple(
+        run.encode('ascii') for run in dict.fromkeys(runs)
+        if len(run) >= MIN_LITERAL_LENGTH and run.isascii()
+    )
+
+
+_PATTERN_SET_CACHE: Dict[str, PatternSet] = {}
+
+
+def compile_pattern_tables(definitions: Dict[str, dict]) -> PatternSet:
+    """Compilar os padrões de todas as definições {framework: config} de uma linguagem
+
+    O limite de leitura de cada padrão vem de `read_limit` da definição; sem
+    ele, padrões de import/require usam HEADER_READ_LIMIT e os demais leem o
+    arquivo inteiro. Um padrão compartilhado usa o maior limite.
+    """
+    limits: Dict[str, Optional[int]] = {}
+    for config in definitions.values():
+        for pattern in config['patterns']:
+            limit = config.get('read_limit', HEADER_READ_LIMIT if HEADER_PATTERN.match(pattern) else None)
+            previous = limits.get(pattern, 0)
+            limits[pattern] = None if limit is None or previous is None else max(limit, previous)
+
+    patterns = list(limits)
+    fingerprint = rules_fingerprint(limits)
+    pattern_set = _PATTERN_SET_CACHE.get(fingerprint)
+    if pattern_set is None:
+        pattern_set = PatternSet(patterns, limits=limits)
+        _PATTERN_SET_CACHE[fingerprint] = pattern_set
+    return pattern_set
+
+
+# Regra de arquivo: (grupo, chave, padrão) — ex: ('files', 'python', 'setup.py')
+Rule = Tuple[str, str, str]
+
+
+class RuleIndex:
+    """Regras de nome/extensão de arquivo compiladas em tabelas de consulta
+
+    Nomes exatos viram uma consulta por nome; globs de sufixo ('*.csproj')
+    e regras de extensão ('.py') viram uma consulta pela extensão final. Só
+    globs genéricos ('test_*.py') são testados com fnmatch. Classificar um
+    arquivo custa poucas consultas a dicionário, independente do número de
+    regras, e cada nome distinto do inventário é classificado uma única vez.
+    """
+
+    def __init__(self, rules: Iterable[Rule], extension_rules: Iterable[Rule] = ()):
+        self.rules: Tuple[Rule, ...] = tuple(dict.fromkeys(rules))
+        self.extension_rules: Tuple[Rule, ...] = tuple(dict.fromkeys(extension_rules))
+        self._by_name: Dict[str, List[Rule]] = {}
+        self._by_suffix: Dict[str, List[Tuple[str, Rule]]] = {}  # extensão final -> [(sufixo, regra)]
+        self._by_extension: Dict[str, List[Rule]] = {}
+        self._globs: List[Rule] = []
+
+        for rule in self.rules:
+            pattern = rule[2]
+            if not any(char in pattern for char in '*?['):
+                self._by_name.setdefault(pattern, []).append(rule)
+            elif pattern.startswith('*') and '.' in pattern and not any(char in pattern[1:] for char in '*?['):
+                suffix = pattern[1:]
+                self._by_suffix.setdefault(_final_extension(suffix), []).append((suffix, rule))
+            else:
+                self._globs.append(rule)
+
+        for rule in self.extension_rules:
+            self._by_extension.setdefault(rule[2], []).append(rule)
+
+    def classify(self, name: str) -> List[Rule]:
+        """Regras que casam com um nome de arquivo"""
+        hits = list(self._by_name.get(name, ()))
+        if self._by_suffix:
+            hits.extend(rule for suffix, rule in self._by_suffix.get(_final_extension(name), ())
+                        if name.endswith(suffix))
+        if self._by_extension:
+            hits.extend(self._by_extension.get(os.path.splitext(name)[1], ()))
+        hits.extend(rule for rule in self._globs if fnmatch.fnmatch(name, rule[2]))
+        return hits
+
+    def match(self, inventory: FileInventory) -> Dict[Rule, List[FileEntry]]:
+        """Arquivos do inventário por regra, em uma passada pelos nomes distintos
+
+        Mesma ordem de `inventory.match()`/`by_extension()`: nomes exatos e
+        extensões na ordem do inventário, globs ordenados por caminho.
+        """
+        matches: Dict[Rule, List[FileEntry]] = {}
+        if self.rules:
+            globbed = set()
+            for name in inventory.names():
+                for rule in self._by_name.get(name, ()):
+                    matches[rule] = list(inventory.by_name(name))
+                for suffix, rule in self._by_suffix.get(_final_extension(name), ()):
+                    if name.endswith(suffix):
+                        matches.setdefault(rule, []).extend(inventory.by_name(name))
+                        globbed.add(rule)
+                for rule in self._globs:
+                    if fnmatch.fnmatch(name, rule[2]):
+                        matches.setdefault(rule, []).extend(inventory.by_name(name))
+                        globbed.add(rule)
+            for rule in globbed:
+                matches[rule].sort(key=lambda entry: entry.path)
+
+        # O inventário já indexa por extensão: uma consulta por regra
+        for rule in self.extension_rules:
+            entries = inventory.by_extension(rule[2])
+            if entries:
+                matches[rule] = list(entries)
+        return matches
+
+
+def _final_extension(name: str) -> str:
+    """Última extensão de um nome ('.csproj'), incluindo nomes como '.csproj'"""
+    index = name.rfind('.')
+    return name[index:] if index >= 0 else ''
+
+
+_RULE_INDEX_CACHE: Dict[str, RuleIndex] = {}
+
+
+def compile_rule_index(rules: Iterable[Rule], extension_rules: Iterable[Rule] = ()) -> RuleIndex:
+    """Compilar regras de arquivo em um RuleIndex, reaproveitado enquanto as regras não mudam"""
+    rules, extension_rules = list(rules), list(extension_rules)
+    fingerprint = rules_fingerprint([rules, extension_rules])
+    index = _RULE_INDEX_CACHE.get(fingerprint)
+    if index is None:
+        index = RuleIndex(rules, extension_rules)
+        _RULE_INDEX_CACHE[fingerprint] = index
+    return index
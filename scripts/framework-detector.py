@@ -5,16 +5,41 @@ Sistema avançado de detecção de frameworks com análise profunda de código
 """
 
 import os
-import re
+import sys
+import fnmatch
 import json
 import yaml
-import ast
-import subprocess
+import contextlib
+import cProfile
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Set
-from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Set
+from dataclasses import dataclass
 import argparse
 
+from project_scanner import (
+    DEFAULT_SKIP_DIRS, CachingReader, ContentScanPool, DetectionMetrics, EventEmitter, FileEntry, FileInventory,
+    ScanBudget, ScanCache, SubprojectResult, result_to_dict,
+    build_subproject_tree, discover_subprojects, is_archive, scan_archive, scan_git_revision,
+    scan_project
+)
+from detection_rules import PatternSet, compile_pattern_tables, compile_rule_index
+from import_index import ImportIndex, build_import_index
+from dependency_index import (
+    LANGUAGE_ECOSYSTEMS, LOCKFILE_PARSERS, MANIFEST_PARSERS, DependencyIndex, build_dependency_index
+)
+
+# Pesos da confiança em décimos: a decisão de parar a busca usa aritmética
+# inteira e não depende de arredondamento
+IMPORT_WEIGHT = 2  # Por arquivo que importa o framework
+PATTERN_WEIGHT = 2  # Por arquivo com um dos padrões
+FILE_WEIGHT = 3  # Por arquivo característico
+DEPENDENCY_WEIGHT = 4  # Por dependência declarada
+CONFIDENCE_THRESHOLD = 5  # Acima disso o framework é reportado
+CONFIDENCE_SATURATION = 10  # Confiança 1.0; pontos além disso não mudam nada
+
+# Arquivos registrados por padrão (somando todas as extensões)
+PATTERN_MATCH_LIMIT = 10
+
 
 @dataclass
 class FrameworkInfo:
@@ -37,17 +62,59 @@ class FrameworkDetectionResult:
     recommendations: List[str]
     config_files: List[str]
     dependencies: Dict[str, str]
+    partial: bool = False  # Prazo/orçamento esgotado antes de cobrir o projeto
+    coverage: float = 1.0  # Fração do projeto efetivamente analisada
+    frameworks_by_language: Optional[Dict[str, List[FrameworkInfo]]] = None  # Modo poliglota (--polyglot)
+    metrics: Optional[Dict[str, Any]] = None  # Tempos por fase e contadores (--profile)
+
+
+class FrameworkScoreboard:
+    """Pontuação de cada framework durante a busca por padrões
+    
+    Um framework está decidido quando satura (a confiança já é 1.0) ou quando,
+    mesmo que todos os arquivos restantes casem seus padrões, não passaria do
+    limiar. Padrões compartilhados continuam ativos enquanto algum framework
+    indeciso depender deles.
+    """
+    
+    def __init__(self, pattern_ids: Dict[str, List[int]], base_scores: Dict[str, int]):
+        self.pattern_ids = pattern_ids  # framework -> padrões (ids do PatternSet)
+        self.base_scores = base_scores  # framework -> pontos sem padrões (imports, arquivos, dependências)
+        self.undecided = list(pattern_ids)
+        self.decided_early = 0  # Decididos antes de ler todos os arquivos
+    
+    def undecided_patterns(self, counts: List[int], remaining: int) -> Set[int]:
+        """Atualizar as decisões e devolver os padrões que ainda podem mudar algum resultado
+        
+        `counts` são os arquivos já encontrados por padrão; `remaining`, os
+        arquivos que ainda serão lidos.
+        """
+        active: Set[int] = set()
+        undecided = []
+        for name in self.undecided:
+            ids = self.pattern_ids[name]
+            score = self.base_scores[name] + PATTERN_WEIGHT * sum(counts[i] for i in ids)
+            reachable = PATTERN_WEIGHT * sum(min(PATTERN_MATCH_LIMIT - counts[i], remaining) for i in ids)
+            if score >= CONFIDENCE_SATURATION or score + reachable <= CONFIDENCE_THRESHOLD:
+                if remaining:
+                    self.decided_early += 1
+                continue
+            undecided.append(name)
+            active.update(i for i in ids if counts[i] < PATTERN_MATCH_LIMIT)
+        self.undecided = undecided
+        return active
 
 
 class FrameworkDetector:
     """Detector avançado de frameworks com análise de código."""
     
-    # Definições de frameworks por linguagem
+    # Definições de frameworks por linguagem; 'imports' (só Python) são
+    # consultados no índice de imports, 'patterns' no texto dos arquivos
     FRAMEWORK_DEFINITIONS = {
         'python': {
             'fastapi': {
+                'imports': ['fastapi'],
                 'patterns': [
-                    r'from\s+fastapi\s+import',
                     r'FastAPI\(',
                     r'@app\.(get|post|put|delete|patch)',
                     r'uvicorn\.run'
@@ -58,8 +125,8 @@ class FrameworkDetector:
                 'description': 'Modern, fast web framework for building APIs'
             },
             'django': {
+                'imports': ['django'],
                 'patterns': [
-                    r'from\s+django',
                     r'Django',
                     r'manage\.py',
                     r'INSTALLED_APPS',
@@ -71,8 +138,8 @@ class FrameworkDetector:
                 'description': 'High-level Python web framework'
             },
             'flask': {
+                'imports': ['flask'],
                 'patterns': [
-                    r'from\s+flask\s+import',
                     r'Flask\(',
                     r'@app\.route',
                     r'app\.run\('
@@ -83,8 +150,8 @@ class FrameworkDetector:
                 'description': 'Lightweight WSGI web application framework'
             },
             'streamlit': {
+                'imports': ['streamlit'],
                 'patterns': [
-                    r'import\s+streamlit',
                     r'st\.',
                     r'streamlit\.run'
                 ],
@@ -94,8 +161,8 @@ class FrameworkDetector:
                 'description': 'Framework for data science web apps'
             },
             'pytorch': {
+                'imports': ['torch'],
                 'patterns': [
-                    r'import\s+torch',
                     r'torch\.',
                     r'nn\.Module',
                     r'torch\.nn'
@@ -106,8 +173,8 @@ class FrameworkDetector:
                 'description': 'Deep learning framework'
             },
             'tensorflow': {
+                'imports': ['tensorflow', 'keras'],
                 'patterns': [
-                    r'import\s+tensorflow',
                     r'tf\.',
                     r'keras',
                     r'tf\.keras'
@@ -118,8 +185,8 @@ class FrameworkDetector:
                 'description': 'Machine learning platform'
             },
             'pytest': {
+                'imports': ['pytest'],
                 'patterns': [
-                    r'import\s+pytest',
                     r'def\s+test_',
                     r'@pytest\.',
                     r'pytest\.main'
@@ -221,23 +288,111 @@ class FrameworkDetector:
         }
     }
     
-    def __init__(self, project_path: str):
+    # Extensões de código-fonte varridas pelos padrões de cada linguagem
+    SOURCE_EXTENSIONS = {
+        'python': ['.py'],
+        'javascript': ['.js', '.jsx', '.mjs'],
+        'typescript': ['.ts', '.tsx'],
+        'go': ['.go'],
+        'rust': ['.rs'],
+        'java': ['.java']
+    }
+    
+    # Arquivos que contam para a auto-detecção de linguagem
+    LANGUAGE_FILES = {
+        'python': ['*.py', 'requirements.txt', 'setup.py', 'pyproject.toml'],
+        'javascript': ['*.js', '*.jsx', 'package.json'],
+        'typescript': ['*.ts', '*.tsx', 'tsconfig.json'],
+        'go': ['*.go', 'go.mod'],
+        'rust': ['*.rs', 'Cargo.toml'],
+        'java': ['*.java', 'pom.xml', 'build.gradle']
+    }
+    
+    def __init__(self, project_path: str, inventory: Optional[FileInventory] = None,
+                 skip_dirs: Optional[Iterable[str]] = None, use_ignore_files: bool = True,
+                 cache: Optional[ScanCache] = None, workers: Optional[int] = None,
+                 use_processes: bool = False, quiet: bool = False,
+                 backend: str = 'auto', rev: Optional[str] = None,
+                 events: Optional[EventEmitter] = None, metrics: Optional[DetectionMetrics] = None):
         """Inicializar detector."""
+        # Arquivo .zip/.tar (ou '-' para stdin) é lido sem extração
+        self.archive = project_path if inventory is None and is_archive(project_path) else None
         self.project_path = Path(project_path).resolve()
         self.language = None
+        self.inventory = inventory
+        self.skip_dirs = skip_dirs
+        self.use_ignore_files = use_ignore_files
+        self.cache = cache
+        self.workers = workers
+        self.use_processes = use_processes
+        self.quiet = quiet
+        self.backend = backend
+        self.rev = rev
+        self.events = events
+        self.metrics = metrics
+        self._pool: Optional[ContentScanPool] = None
+        self.dependency_index: Optional[DependencyIndex] = None
+        self.budget: Optional[ScanBudget] = None
+        self._content_coverage = 1.0
+        
+    def detect(self, language: str = None, budget: Optional[ScanBudget] = None,
+               polyglot: bool = False) -> FrameworkDetectionResult:
+        """Executar detecção completa de frameworks.
+        
+        Com `budget` (prazo e limites de arquivos/bytes), a busca em código
+        para ao esgotá-lo; o resultado é marcado como parcial e só a parte da
+        confiança de cada framework que vem de conteúdo (imports e padrões) é
+        proporcional à cobertura.
         
-    def detect(self, language: str = None) -> FrameworkDetectionResult:
-        """Executar detecção completa de frameworks."""
-        print(f"🔍 Detectando frameworks em: {self.project_path}")
+        Com `polyglot`, as definições de todas as linguagens são avaliadas
+        sobre o mesmo inventário e os frameworks encontrados saem agrupados em
+        `frameworks_by_language`; os demais campos continuam se referindo à
+        linguagem principal.
+        """
+        self.budget = budget
+        self._content_coverage = 1.0  # Cobertura desta execução, não da anterior
+        if not self.quiet:
+            print(f"🔍 Detectando frameworks em: {self.archive or self.project_path}")
+        
+        # Travessia única com poda de diretórios ignorados
+        with self._phase('inventory'):
+            self._ensure_inventory()
+        if self.events is not None:
+            self.events.emit('inventory', files=len(self.inventory), directories=len(self.inventory.directories),
+                             coverage=self.inventory.coverage)
         
         # Auto-detectar linguagem se não fornecida
         if not language:
-            language = self._auto_detect_language()
+            with self._phase('language'):
+                language = self._auto_detect_language()
         
-        self.language = language
+        # Linguagem principal primeiro: com prazo curto, é ela que é coberta
+        languages = [language]
+        if polyglot:
+            languages += [lang for lang in self.FRAMEWORK_DEFINITIONS if lang != language]
         
-        # Detectar frameworks
-        frameworks = self._detect_frameworks()
+        # Manifestos de dependência lidos e interpretados uma única vez; dos
+        # lockfiles, só as versões das dependências dos frameworks conhecidos
+        with self._phase('manifests'):
+            self.dependency_index = build_dependency_index(self.inventory, self.metrics)
+            wanted_by_ecosystem: Dict[str, List[str]] = {}
+            for lang in languages:
+                if lang in self.FRAMEWORK_DEFINITIONS and lang in LANGUAGE_ECOSYSTEMS:
+                    wanted_by_ecosystem.setdefault(LANGUAGE_ECOSYSTEMS[lang], []).extend(
+                        dep for config in self.FRAMEWORK_DEFINITIONS[lang].values() for dep in config['dependencies']
+                    )
+            for ecosystem, wanted in wanted_by_ecosystem.items():
+                self.dependency_index.resolve_locked(self.inventory, wanted, ecosystem, self.metrics)
+        
+        # Detectar frameworks (conteúdo lido em paralelo); cada linguagem lê
+        # só as próprias extensões, então nenhum arquivo é lido duas vezes
+        frameworks_by_language = {}
+        with self._phase('frameworks'), ContentScanPool(self.workers, self.use_processes) as self._pool:
+            for lang in languages:
+                self.language = lang
+                frameworks_by_language[lang] = self._detect_frameworks()
+        self.language = language
+        frameworks = frameworks_by_language[language]
         
         # Determinar framework principal
         primary_framework = None
@@ -245,16 +400,29 @@ class FrameworkDetector:
             primary_framework = max(frameworks, key=lambda f: f.confidence).name
         
         # Detectar tipo de projeto
-        project_type = self._detect_project_type(frameworks)
+        with self._phase('project_type'):
+            project_type = self._detect_project_type(frameworks)
         
         # Gerar recomendações
         recommendations = self._generate_recommendations(frameworks, project_type)
         
         # Encontrar arquivos de configuração
-        config_files = self._find_config_files()
+        with self._phase('config_files'):
+            config_files = self._find_config_files()
         
         # Extrair dependências
-        dependencies = self._extract_dependencies()
+        with self._phase('dependencies'):
+            dependencies = self._extract_dependencies()
+        
+        if self.cache is not None:
+            self.cache.save()
+        
+        coverage = self.inventory.coverage * self._content_coverage
+        for lang, found in frameworks_by_language.items():
+            for framework in found:
+                if self.events is not None:
+                    self.events.emit('framework', language=lang, name=framework.name,
+                                     confidence=framework.confidence, category=framework.category)
         
         return FrameworkDetectionResult(
             primary_framework=primary_framework,
@@ -263,71 +431,177 @@ class FrameworkDetector:
             project_type=project_type,
             recommendations=recommendations,
             config_files=config_files,
-            dependencies=dependencies
+            dependencies=dependencies,
+            partial=coverage < 1.0 or (budget is not None and budget.exhausted),
+            coverage=coverage,
+            frameworks_by_language={
+                lang: found for lang, found in frameworks_by_language.items() if found
+            } if polyglot else None,
+            metrics=self._collect_metrics()
         )
     
+    def detect_subprojects(self, language: str = None) -> SubprojectResult:
+        """Detectar frameworks de cada sub-projeto de um monorepo com uma única travessia."""
+        if not self.quiet:
+            print(f"🔍 Detectando frameworks no monorepo: {self.project_path}")
+        
+        self._ensure_inventory()
+        prefixes = discover_subprojects(self.inventory)
+        views = self.inventory.partition(prefixes)
+        jobs = [(str(self.project_path), self.inventory, language)] + [
+            (str(self.project_path / prefix), views[prefix], language) for prefix in prefixes
+        ]
+        
+        # Sub-projetos em paralelo; cada detecção interna é serial
+        with ContentScanPool(self.workers, self.use_processes) as pool:
+            results = pool.map(_detect_subproject, jobs)
+        
+        return build_subproject_tree(dict(zip([''] + prefixes, results)))
+    
+    def _ensure_inventory(self):
+        """Montar o inventário com uma única travessia, se ainda não fornecido.
+        
+        O leitor é envolvido em um CachingReader: o índice de imports e a
+        busca por padrões leem cada arquivo Python do disco uma única vez.
+        """
+        if self.inventory is None and self.rev:
+            self.inventory = scan_git_revision(self.project_path, self.rev, self.skip_dirs)
+        elif self.inventory is None and self.archive:
+            self.inventory = scan_archive(self.archive, self.skip_dirs, wanted=self.wants_member)
+        elif self.inventory is None:
+            self.inventory = scan_project(
+                self.project_path, skip_dirs=self.skip_dirs,
+                use_ignore_files=self.use_ignore_files, cache=self.cache, backend=self.backend,
+                budget=self.budget, events=self.events, metrics=self.metrics
+            )
+        if not isinstance(self.inventory.reader, CachingReader):
+            self.inventory.reader = CachingReader(self.inventory.reader)
+    
+    def _phase(self, name: str):
+        """Contexto de uma fase de detecção (eventos e métricas, se habilitados)."""
+        stack = contextlib.ExitStack()
+        if self.events is not None:
+            stack.enter_context(self.events.phase(name))
+        if self.metrics is not None:
+            stack.enter_context(self.metrics.phase(name))
+        return stack
+    
+    def _collect_metrics(self) -> Optional[Dict[str, Any]]:
+        """Métricas da execução com os totais do inventário e do cache, ou None se desabilitadas."""
+        if self.metrics is None:
+            return None
+        self.metrics.counters['files_visited'] = len(self.inventory)
+        self.metrics.counters['directories_visited'] = len(self.inventory.directories)
+        if self.cache is not None:
+            self.metrics.counters['cache_hits'] = self.cache.hits
+            self.metrics.counters['cache_misses'] = self.cache.misses
+        return self.metrics.as_dict()
+    
+    @classmethod
+    def wants_member(cls, path: str) -> bool:
+        """Membros de arquivo compactado cujo conteúdo a detecção pode ler."""
+        name = path.rsplit('/', 1)[-1]
+        if any(fnmatch.fnmatch(name, pattern) for pattern, _, _ in MANIFEST_PARSERS + LOCKFILE_PARSERS):
+            return True
+        return any(name.endswith(ext) for exts in cls.SOURCE_EXTENSIONS.values() for ext in exts)
+    
     def _auto_detect_language(self) -> str:
         """Auto-detectar linguagem principal do projeto."""
-        language_files = {
-            'python': ['*.py', 'requirements.txt', 'setup.py', 'pyproject.toml'],
-            'javascript': ['*.js', '*.jsx', 'package.json'],
-            'typescript': ['*.ts', '*.tsx', 'tsconfig.json'],
-            'go': ['*.go', 'go.mod'],
-            'rust': ['*.rs', 'Cargo.toml'],
-            'java': ['*.java', 'pom.xml', 'build.gradle']
-        }
+        # Todas as regras de todas as linguagens em uma passada pelos nomes
+        rule_index = compile_rule_index(
+            (lang, lang, pattern) for lang, patterns in self.LANGUAGE_FILES.items() for pattern in patterns
+        )
+        matches = rule_index.match(self.inventory)
         
         scores = {}
-        for lang, patterns in language_files.items():
-            count = 0
-            for pattern in patterns:
-                count += len(list(self.project_path.glob(f"**/{pattern}")))
-            scores[lang] = count
+        for lang, patterns in self.LANGUAGE_FILES.items():
+            scores[lang] = sum(len(matches.get((lang, lang, pattern), ())) for pattern in patterns)
         
         return max(scores.items(), key=lambda x: x[1])[0] if scores else 'python'
     
     def _detect_frameworks(self) -> List[FrameworkInfo]:
-        """Detectar frameworks baseado em padrões de código."""
+        """Detectar frameworks baseado em padrões de código.
+        
+        Só a parte da confiança que vem de conteúdo (imports e padrões) é
+        proporcional à cobertura da leitura desta linguagem; arquivos
+        característicos e dependências não dependem de ler código.
+        """
         if self.language not in self.FRAMEWORK_DEFINITIONS:
             return []
         
         frameworks = []
         definitions = self.FRAMEWORK_DEFINITIONS[self.language]
+        pattern_set = compile_pattern_tables(definitions)
+        previous_coverage, self._content_coverage = self._content_coverage, 1.0
+        
+        # Imports extraídos da árvore sintática, uma vez por conteúdo distinto
+        import_index = ImportIndex()
+        if self.language == 'python' and any(config.get('imports') for config in definitions.values()):
+            with self._phase('imports'):
+                import_index = self._build_import_index()
+        
+        # Evidências que não dependem de ler arquivos vêm primeiro: com elas,
+        # a busca por padrões sabe quais frameworks já estão decididos
+        importers = {}
+        files = {}
+        deps = {}
+        base_scores = {}
+        for framework_name, config in definitions.items():
+            importers[framework_name] = [import_index.files_importing(module) for module in config.get('imports', [])]
+            files[framework_name] = [self._match_files(file_pattern) for file_pattern in config['files']]
+            deps[framework_name] = self._check_dependencies(config['dependencies'])
+            base_scores[framework_name] = (
+                IMPORT_WEIGHT * sum(len(found) for found in importers[framework_name])
+                + FILE_WEIGHT * sum(len(found) for found in files[framework_name])
+                + DEPENDENCY_WEIGHT * len(deps[framework_name])
+            )
+        
+        # Todos os padrões da linguagem em uma única leitura por arquivo
+        scoreboard = FrameworkScoreboard(
+            {name: [pattern_set.index(pattern) for pattern in config['patterns']]
+             for name, config in definitions.items()},
+            base_scores
+        )
+        pattern_matches = self._search_patterns_in_files(pattern_set, scoreboard)
+        coverage = self.inventory.coverage * self._content_coverage
+        self._content_coverage = min(previous_coverage, self._content_coverage)
         
         for framework_name, config in definitions.items():
             evidence = []
-            confidence = 0.0
+            score = base_scores[framework_name]
+            content_score = IMPORT_WEIGHT * sum(len(found) for found in importers[framework_name])
             version = None
             
+            # Verificar arquivos que importam o framework
+            for found in importers[framework_name]:
+                evidence.extend(found[:3])
+            
             # Verificar padrões em arquivos
             for pattern in config['patterns']:
-                matches = self._search_pattern_in_files(pattern)
+                matches = pattern_matches[pattern]
                 if matches:
                     evidence.extend(matches[:3])  # Limitar evidências
-                    confidence += len(matches) * 0.2
+                    score += PATTERN_WEIGHT * len(matches)
+                    content_score += PATTERN_WEIGHT * len(matches)
             
             # Verificar arquivos específicos
-            for file_pattern in config['files']:
-                files = list(self.project_path.glob(f"**/{file_pattern}"))
-                if files:
-                    evidence.extend([str(f.relative_to(self.project_path)) for f in files[:2]])
-                    confidence += len(files) * 0.3
+            for found in files[framework_name]:
+                evidence.extend(found[:2])
             
             # Verificar dependências
-            deps = self._check_dependencies(config['dependencies'])
-            if deps:
-                evidence.extend([f"dependency: {dep}" for dep in deps[:2]])
-                confidence += len(deps) * 0.4
+            if deps[framework_name]:
+                evidence.extend([f"dependency: {dep}" for dep in deps[framework_name][:2]])
                 
                 # Tentar extrair versão
-                version = self._extract_version(framework_name, deps)
+                version = self._extract_version(framework_name, deps[framework_name])
             
             # Se há evidência suficiente, adicionar framework
-            if confidence > 0.5:
+            if score > CONFIDENCE_THRESHOLD:
+                scaled = score - content_score * (1.0 - coverage)
                 frameworks.append(FrameworkInfo(
                     name=framework_name,
                     version=version,
-                    confidence=min(confidence, 1.0),
+                    confidence=min(scaled, CONFIDENCE_SATURATION) / CONFIDENCE_SATURATION,
                     evidence=evidence,
                     category=config['category'],
                     description=config['description']
@@ -336,104 +610,124 @@ class FrameworkDetector:
         # Ordenar por confiança
         return sorted(frameworks, key=lambda f: f.confidence, reverse=True)
     
-    def _search_pattern_in_files(self, pattern: str) -> List[str]:
-        """Buscar padrão em arquivos do projeto."""
-        matches = []
-        regex = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
-        
-        # Definir extensões por linguagem
-        extensions = {
-            'python': ['.py'],
-            'javascript': ['.js', '.jsx', '.mjs'],
-            'typescript': ['.ts', '.tsx'],
-            'go': ['.go'],
-            'rust': ['.rs'],
-            'java': ['.java']
-        }.get(self.language, ['.py'])
-        
-        for ext in extensions:
-            for file_path in self.project_path.glob(f"**/*{ext}"):
-                if self._should_skip_file(file_path):
-                    continue
-                
-                try:
-                    content = file_path.read_text(encoding='utf-8')
-                    if regex.search(content):
-                        matches.append(str(file_path.relative_to(self.project_path)))
-                        if len(matches) >= 10:  # Limitar resultados
-                            break
-                except (UnicodeDecodeError, PermissionError):
-                    continue
+    def _search_patterns_in_files(self, pattern_set: PatternSet,
+                                  scoreboard: Optional[FrameworkScoreboard] = None) -> Dict[str, List[str]]:
+        """Buscar todos os padrões nos arquivos do projeto, lendo cada arquivo uma vez.
+        
+        Cada padrão registra no máximo PATTERN_MATCH_LIMIT arquivos, somando
+        todas as extensões. Com `scoreboard`, padrões de frameworks já decididos
+        deixam de ser buscados, e a busca termina quando nenhum resultado pode mudar.
+        """
+        matches: Dict[str, List[str]] = {pattern: [] for pattern in pattern_set.patterns}
+        counts = [0] * len(pattern_set.patterns)
+        
+        extensions = self.SOURCE_EXTENSIONS.get(self.language, ['.py'])
+        
+        # Lotes pequenos mantêm o limite de resultados efetivo mesmo em paralelo
+        batch_size = 4 * (self.workers or os.cpu_count() or 1)
+        candidates_by_ext = {
+            ext: [entry for entry in self.inventory.by_extension(ext) if not self._should_skip_file(entry)]
+            for ext in extensions
+        }
+        total = sum(len(candidates) for candidates in candidates_by_ext.values())
+        remaining = total  # Arquivos ainda não lidos, para a pontuação máxima alcançável
+        unscanned = 0  # Arquivos deixados de fora por prazo/orçamento
+        
+        # Padrões que ainda podem mudar o resultado de algum framework
+        if scoreboard is not None:
+            active = scoreboard.undecided_patterns(counts, remaining)
+        else:
+            active = set(range(len(pattern_set.patterns)))
         
+        for ext, candidates in candidates_by_ext.items():
+            if not active:
+                break
+            
+            # O inventário está em largura: arquivos rasos são lidos primeiro.
+            # Arquivos já lidos pelo índice de imports não contam de novo no orçamento
+            for start in range(0, len(candidates), batch_size):
+                batch = candidates[start:start + batch_size]
+                requested = len(batch)
+                if self.budget is not None:
+                    batch = self.budget.admit(batch, pattern_set.read_limit(active))
+                    if len(batch) < requested:
+                        unscanned += len(candidates) - start - len(batch)
+                ids = tuple(sorted(active))
+                found = self._pool.map(_pattern_hits, [
+                    (self.inventory.reader, entry.path, pattern_set, ids, self._cached_content(entry, pattern_set, ids))
+                    for entry in batch
+                ])
+                for entry, (hits, stats) in zip(batch, found):
+                    if self.metrics is not None:
+                        for name, value in stats.items():
+                            self.metrics.count(name, value)
+                    if self.events is not None and hits & active:
+                        self.events.emit('pattern_hit', path=entry.path, patterns=[
+                            pattern_set.patterns[pattern_id] for pattern_id in sorted(hits & active)
+                        ])
+                    for pattern_id in sorted(hits & active):
+                        matches[pattern_set.patterns[pattern_id]].append(entry.path)
+                        counts[pattern_id] += 1
+                        if counts[pattern_id] >= PATTERN_MATCH_LIMIT:  # Limitar resultados
+                            active.discard(pattern_id)
+                remaining -= len(batch)
+                if scoreboard is not None:
+                    active = scoreboard.undecided_patterns(counts, remaining)
+                if not active or len(batch) < requested:
+                    break
+        
+        if self.metrics is not None and scoreboard is not None:
+            self.metrics.count('frameworks_decided_early', scoreboard.decided_early)
+        if total:
+            self._content_coverage = min(self._content_coverage, 1.0 - unscanned / total)
         return matches
     
-    def _should_skip_file(self, file_path: Path) -> bool:
-        """Verificar se deve pular arquivo na análise."""
-        skip_patterns = [
-            '__pycache__', 'node_modules', '.git', '.venv', 'venv',
-            'build', 'dist', 'target', '.pytest_cache', 'coverage'
+    def _cached_content(self, entry: FileEntry, pattern_set: PatternSet, ids: Tuple[int, ...]) -> Optional[bytes]:
+        """Conteúdo já lido (ex: pelo índice de imports), enviado junto com o arquivo ao pool."""
+        reader = self.inventory.reader
+        if isinstance(reader, CachingReader):
+            return reader.peek(entry.path, pattern_set.read_limit(ids))
+        return None
+    
+    def _build_import_index(self) -> ImportIndex:
+        """Índice de imports dos arquivos Python do projeto (em largura, como a busca por padrões)."""
+        entries = [
+            entry for ext in self.SOURCE_EXTENSIONS['python']
+            for entry in self.inventory.by_extension(ext) if not self._should_skip_file(entry)
         ]
-        
-        path_str = str(file_path)
-        return any(pattern in path_str for pattern in skip_patterns) or file_path.stat().st_size > 1024*1024
+        # A análise sintática (CPU) vai para processos independente de --processes
+        import_index = build_import_index(
+            self.inventory.reader, entries, self.workers, self.cache, self.budget, self.metrics
+        )
+        if self.events is not None:
+            for path, modules in import_index.files.items():
+                self.events.emit('import_hit', path=path, modules=modules)
+        self._content_coverage = min(self._content_coverage, import_index.coverage)
+        return import_index
+    
+    def _should_skip_file(self, entry: FileEntry) -> bool:
+        """Verificar se deve pular arquivo na análise."""
+        # Diretórios irrelevantes já foram podados na travessia; o tamanho vem do inventário
+        return entry.size > 1024*1024
+    
+    def _match_files(self, file_pattern: str) -> List[str]:
+        """Caminhos de arquivos (ou diretórios, se terminar com '/') que casam com o padrão."""
+        if file_pattern.endswith('/'):
+            return self.inventory.match_directories(file_pattern)
+        return [entry.path for entry in self.inventory.match(file_pattern)]
     
     def _check_dependencies(self, dependencies: List[str]) -> List[str]:
-        """Verificar se dependências estão presentes."""
-        found_deps = []
-        
-        # Arquivos de dependência por linguagem
-        dep_files = {
-            'python': ['requirements.txt', 'setup.py', 'pyproject.toml', 'Pipfile'],
-            'javascript': ['package.json'],
-            'typescript': ['package.json'],
-            'go': ['go.mod'],
-            'rust': ['Cargo.toml'],
-            'java': ['pom.xml', 'build.gradle']
-        }.get(self.language, [])
-        
-        for dep_file in dep_files:
-            file_path = self.project_path / dep_file
-            if file_path.exists():
-                try:
-                    content = file_path.read_text()
-                    for dep in dependencies:
-                        if dep in content:
-                            found_deps.append(dep)
-                except (UnicodeDecodeError, PermissionError):
-                    continue
-        
-        return found_deps
+        """Dependências declaradas nos manifestos do projeto."""
+        ecosystem = LANGUAGE_ECOSYSTEMS.get(self.language)
+        return [dep for dep in dependencies if self.dependency_index.get(dep, ecosystem)]
     
     def _extract_version(self, framework: str, dependencies: List[str]) -> Optional[str]:
         """Extrair versão do framework."""
-        # Implementação básica - pode ser expandida
-        if self.language == 'python':
-            req_file = self.project_path / 'requirements.txt'
-            if req_file.exists():
-                content = req_file.read_text()
-                for dep in dependencies:
-                    match = re.search(f'{dep}[>=<~!]*([0-9.]+)', content)
-                    if match:
-                        return match.group(1)
-        
-        elif self.language in ['javascript', 'typescript']:
-            package_file = self.project_path / 'package.json'
-            if package_file.exists():
-                try:
-                    with open(package_file) as f:
-                        package_data = json.load(f)
-                    
-                    for section in ['dependencies', 'devDependencies']:
-                        if section in package_data:
-                            for dep in dependencies:
-                                if dep in package_data[section]:
-                                    version = package_data[section][dep]
-                                    # Limpar prefixos como ^, ~, >=
-                                    clean_version = re.sub(r'[^0-9.]', '', version)
-                                    return clean_version
-                except (json.JSONDecodeError, KeyError):
-                    pass
-        
+        ecosystem = LANGUAGE_ECOSYSTEMS.get(self.language)
+        for dep in dependencies:
+            dependency = self.dependency_index.get(dep, ecosystem)
+            if dependency is not None and dependency.version:
+                return dependency.version
         return None
     
     def _detect_project_type(self, frameworks: List[FrameworkInfo]) -> str:
@@ -516,76 +810,188 @@ class FrameworkDetector:
             '.env*', 'Dockerfile', 'docker-compose.yml', 'Makefile'
         ]
         
-        config_files = []
+        # Raiz listada direto do disco, como um glob: arquivos ignorados
+        # (ex: .env) e diretórios também contam
+        root_names = self.inventory.reader.list_root()
+        if root_names is None:  # Revisão git ou arquivo compactado
+            root_names = [entry.name for entry in self.inventory if entry.depth == 0]
+            root_names += [directory for directory in self.inventory.directories if '/' not in directory]
+        config_files = set()
         for pattern in config_patterns:
-            files = list(self.project_path.glob(pattern))
-            config_files.extend([str(f.relative_to(self.project_path)) for f in files])
+            config_files.update(fnmatch.filter(root_names, pattern))
         
         return sorted(config_files)
     
     def _extract_dependencies(self) -> Dict[str, str]:
         """Extrair lista de dependências do projeto."""
-        dependencies = {}
-        
-        if self.language == 'python':
-            req_file = self.project_path / 'requirements.txt'
-            if req_file.exists():
-                content = req_file.read_text()
-                for line in content.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        match = re.match(r'([a-zA-Z0-9_-]+)([>=<~!]*[0-9.]*)', line)
-                        if match:
-                            name, version = match.groups()
-                            dependencies[name] = version or 'latest'
-        
-        elif self.language in ['javascript', 'typescript']:
-            package_file = self.project_path / 'package.json'
-            if package_file.exists():
-                try:
-                    with open(package_file) as f:
-                        package_data = json.load(f)
-                    
-                    for section in ['dependencies', 'devDependencies']:
-                        if section in package_data:
-                            dependencies.update(package_data[section])
-                except json.JSONDecodeError:
-                    pass
-        
-        return dependencies
+        ecosystem = LANGUAGE_ECOSYSTEMS.get(self.language)
+        return {dep.name: dep.spec or 'latest' for dep in self.dependency_index.for_ecosystem(ecosystem)}
+
+
+def _pattern_hits(job: Tuple[Any, str, PatternSet, Tuple[int, ...], Optional[bytes]]) -> Tuple[Set[int], Dict[str, int]]:
+    """Padrões ativos que ocorrem no arquivo, em uma única leitura (executado no pool).
+    
+    Retorna também os contadores da leitura (arquivos e bytes lidos, buscas
+    em regex). Conteúdo já lido chega pronto no job e não conta como leitura.
+    """
+    reader, rel_path, pattern_set, ids, raw = job
+    # Só o trecho inicial é lido quando todos os padrões ativos são de cabeçalho
+    limit = pattern_set.read_limit(ids)
+    if raw is not None:
+        stats = {}
+    else:
+        try:
+            raw = reader.read_bytes(rel_path, limit)
+        except OSError:
+            return set(), {}
+        stats = {'files_read': 1, 'bytes_read': len(raw)}
+    # Pré-filtro por literais: a maioria dos arquivos nunca chega à regex
+    hits = pattern_set.search_bytes(raw, ids, truncated=limit is not None and len(raw) >= limit, stats=stats)
+    return hits, stats
+
+
+def _detect_subproject(job: Tuple[str, FileInventory, Optional[str]]) -> FrameworkDetectionResult:
+    """Detectar frameworks de um sub-projeto sobre sua visão do inventário (executado no pool)."""
+    project_path, inventory, language = job
+    return FrameworkDetector(project_path, inventory=inventory, workers=1, quiet=True).detect(language)
+
+
+def _print_subproject_tree(node: SubprojectResult, indent: int = 0):
+    """Imprimir árvore de sub-projetos em formato texto."""
+    result = node.result
+    frameworks = ', '.join(fw.name for fw in result.detected_frameworks) or '-'
+    print(f"{'   ' * indent}📦 {node.path or '.'}: {result.language} | "
+          f"principal: {result.primary_framework or '-'} | frameworks: {frameworks}")
+    for child in node.subprojects:
+        _print_subproject_tree(child, indent + 1)
+
+
+def _print_metrics(metrics: Dict[str, Any]):
+    """Imprimir métricas por fase e contadores em formato texto."""
+    print(f"\n⏱️  **Métricas:**")
+    for name, totals in metrics['phases'].items():
+        print(f"   • {name}: {totals['wall_seconds'] * 1000:.1f} ms (CPU {totals['cpu_seconds'] * 1000:.1f} ms)")
+    for name, value in metrics['counters'].items():
+        print(f"   • {name}: {value}")
 
 
 def main():
     """CLI principal."""
     parser = argparse.ArgumentParser(description='Framework Detection Engine')
-    parser.add_argument('project_path', help='Caminho para o projeto')
+    parser.add_argument('project_path',
+                        help='Caminho para o projeto (diretório, .zip/.tar ou - para stdin)')
     parser.add_argument('--language', '-l', help='Linguagem específica para análise')
     parser.add_argument('--output', '-o', choices=['json', 'yaml', 'text'], default='text',
                         help='Formato de saída')
     parser.add_argument('--verbose', '-v', action='store_true',
                         help='Output detalhado')
+    parser.add_argument('--skip-dir', action='append', default=[], metavar='NOME',
+                        help='Diretório adicional a ignorar na travessia (pode repetir)')
+    parser.add_argument('--no-ignore', action='store_true',
+                        help='Não respeitar .gitignore/.ignore do projeto')
+    parser.add_argument('--cache', nargs='?', const='auto', metavar='ARQUIVO',
+                        help='Reaproveitar travessia e imports já analisados da execução anterior '
+                             '(padrão: cache no diretório temporário)')
+    parser.add_argument('--workers', '-j', type=int, metavar='N',
+                        help='Número de workers para leitura de conteúdo (1 = serial)')
+    parser.add_argument('--processes', action='store_true',
+                        help='Usar pool de processos em vez de threads na busca por regex')
+    parser.add_argument('--backend', choices=['auto', 'walk'], default='auto',
+                        help='Enumeração de arquivos: auto = índice do git em work trees, '
+                             'walk = sempre percorrer o disco')
+    parser.add_argument('--rev', metavar='REVISÃO',
+                        help='Analisar uma revisão git (commit, tag, branch) sem checkout')
+    parser.add_argument('--monorepo', action='store_true',
+                        help='Detectar cada sub-projeto (package.json, pyproject.toml, go.mod...) separadamente')
+    parser.add_argument('--polyglot', action='store_true',
+                        help='Avaliar os frameworks de todas as linguagens e agrupá-los por linguagem')
+    parser.add_argument('--deadline', type=float, metavar='SEGUNDOS',
+                        help='Prazo da detecção; ao esgotar, devolve resultado parcial')
+    parser.add_argument('--max-files', type=int, metavar='N',
+                        help='Máximo de arquivos com conteúdo lido')
+    parser.add_argument('--max-bytes', type=int, metavar='N',
+                        help='Máximo de bytes de conteúdo lidos')
+    parser.add_argument('--events', choices=['ndjson'],
+                        help='Emitir eventos de progresso/evidência em stdout durante a detecção '
+                             '(o resultado final vem no evento "result")')
+    parser.add_argument('--profile', nargs='?', const='', metavar='ARQUIVO.pstats',
+                        help='Incluir métricas por fase no resultado; com ARQUIVO, salvar também '
+                             'o perfil cProfile (pstats)')
     
     args = parser.parse_args()
     
-    if not os.path.exists(args.project_path):
+    if args.project_path != '-' and not os.path.exists(args.project_path):
         print(f"❌ Erro: Caminho '{args.project_path}' não encontrado")
         return 1
     
     # Executar detecção
-    detector = FrameworkDetector(args.project_path)
-    result = detector.detect(args.language)
+    cache = None
+    if args.cache:
+        cache = ScanCache.for_project(args.project_path, 'frameworks') if args.cache == 'auto' else ScanCache(args.cache)
+    
+    detector = FrameworkDetector(
+        args.project_path,
+        skip_dirs=DEFAULT_SKIP_DIRS | set(args.skip_dir),
+        use_ignore_files=not args.no_ignore,
+        cache=cache,
+        workers=args.workers,
+        use_processes=args.processes,
+        backend=args.backend,
+        rev=args.rev,
+        quiet=bool(args.events) or args.output != 'text',  # JSON/YAML puros em stdout
+        events=EventEmitter() if args.events else None,
+        metrics=DetectionMetrics() if args.profile is not None else None
+    )
+    if args.rev:
+        # Validar a revisão antes de iniciar a detecção
+        try:
+            detector.inventory = scan_git_revision(detector.project_path, args.rev, detector.skip_dirs)
+        except ValueError as e:
+            print(f"❌ Erro: {e}")
+            return 1
+    
+    if args.monorepo:
+        tree = detector.detect_subprojects(args.language)
+        if args.events:
+            detector.events.emit('result', result=result_to_dict(tree))
+        elif args.output == 'json':
+            print(json.dumps(result_to_dict(tree), indent=2, ensure_ascii=False))
+        elif args.output == 'yaml':
+            print(yaml.dump(result_to_dict(tree), default_flow_style=False, allow_unicode=True))
+        else:
+            print(f"\n🚀 **Frameworks por sub-projeto:**")
+            _print_subproject_tree(tree)
+        return 0
+    
+    budget = None
+    if args.deadline is not None or args.max_files is not None or args.max_bytes is not None:
+        budget = ScanBudget(args.deadline, args.max_files, args.max_bytes)
+    
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    
+    result = detector.detect(args.language, budget, polyglot=args.polyglot)
+    
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
     
     # Output
-    if args.output == 'json':
-        print(json.dumps(asdict(result), indent=2, ensure_ascii=False))
+    if args.events:
+        detector.events.emit('result', result=result_to_dict(result))
+    elif args.output == 'json':
+        print(json.dumps(result_to_dict(result), indent=2, ensure_ascii=False))
     elif args.output == 'yaml':
-        print(yaml.dump(asdict(result), default_flow_style=False, allow_unicode=True))
+        print(yaml.dump(result_to_dict(result), default_flow_style=False, allow_unicode=True))
     else:
         print(f"\n🚀 **Detecção de Frameworks:**")
         print(f"   📁 Projeto: {args.project_path}")
         print(f"   🔤 Linguagem: {result.language}")
         print(f"   🏗️  Tipo: {result.project_type}")
         print(f"   🎯 Framework Principal: {result.primary_framework or 'Nenhum detectado'}")
+        if result.partial:
+            print(f"   ⚠️  Resultado parcial: {result.coverage:.1%} do projeto analisado")
         
         if result.detected_frameworks:
             print(f"\n🔍 **Frameworks Detectados:**")
@@ -596,6 +1002,13 @@ def main():
                     print(f"     {fw.description}")
                     print(f"     Evidências: {', '.join(fw.evidence[:3])}")
         
+        if result.frameworks_by_language:
+            print(f"\n🌐 **Frameworks por Linguagem:**")
+            for lang, found in result.frameworks_by_language.items():
+                print(f"   🔤 {lang}: " + ', '.join(
+                    f"{fw.name}{f' v{fw.version}' if fw.version else ''} ({fw.confidence:.1%})" for fw in found
+                ))
+        
         if result.recommendations:
             print(f"\n💡 **Recomendações:**")
             for rec in result.recommendations:
@@ -605,6 +1018,12 @@ def main():
             print(f"\n📦 **Dependências ({len(result.dependencies)}):**")
             for name, version in list(result.dependencies.items())[:10]:
                 print(f"   • {name}: {version}")
+        
+        if result.metrics:
+            _print_metrics(result.metrics)
+    
+    if args.profile:
+        print(f"📈 Perfil cProfile salvo em: {args.profile}", file=sys.stderr)
     
     return 0
 
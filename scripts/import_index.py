@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+AI Project Template - Import Index
+Imports de cada arquivo Python extraídos da árvore sintática (ast), sem os
+falsos positivos de regex em comentários/strings e cobrindo `import x as y`.
+Cada arquivo vira um conjunto compacto de módulos importados; a análise roda
+em um pool de processos e é cacheada por tamanho/mtime (sem reler o arquivo)
+e pelo hash do conteúdo, de modo que arquivos inalterados (ou idênticos)
+nunca são analisados de novo.
+"""
+
+import os
+import re
+import ast
+import hashlib
+import warnings
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from project_scanner import (
+    CachingReader, ContentScanPool, DetectionMetrics, FileEntry, ScanBudget, ScanCache, decode_sample,
+    rules_fingerprint
+)
+
+# Versão do extrator: mudar invalida os imports em cache
+IMPORT_CACHE_FINGERPRINT = rules_fingerprint(['python-imports', 1])
+
+# Arquivos lidos por lote (limita o conteúdo mantido em memória)
+IMPORT_BATCH_SIZE = 256
+
+# Abaixo disso, a análise é feita no próprio processo (criar o pool de processos custa mais)
+PROCESS_POOL_THRESHOLD = 32
+
+# Fallback para arquivos que não compilam (ex: Python 2): só linhas de import
+IMPORT_LINE_PATTERN = re.compile(
+    r'^[ \t]*(?:from[ \t]+([\w.]+)[ \t]+import\b|import[ \t]+([\w.]+(?:[ \t]*,[ \t]*[\w.]+)*))', re.MULTILINE
+)
+
+
+def extract_python_imports(raw: bytes) -> Optional[List[str]]:
+    """Módulos importados (nomes completos, ordenados); None se não for texto
+
+    Imports relativos (`from . import x`) são do próprio projeto e ficam de
+    fora. Imports dentro de funções e blocos try/if também contam.
+    """
+    text = decode_sample(raw)
+    if text is None:
+        return None
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # SyntaxWarning de escapes inválidos em strings
+            tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return _imports_by_line(text)
+
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.add(node.module)
+    return sorted(modules)
+
+
+def _imports_by_line(text: str) -> List[str]:
+    modules = set()
+    for from_module, import_list in IMPORT_LINE_PATTERN.findall(text):
+        if from_module:
+            modules.add(from_module)
+        else:
+            modules.update(name.strip() for name in import_list.split(','))
+    return sorted(modules)
+
+
+def _parse_imports(raw: bytes) -> Optional[List[str]]:
+    """Executado no pool de processos"""
+    return extract_python_imports(raw)
+
+
+def _read_content(job: Tuple[object, str]) -> Tuple[Optional[bytes], bool]:
+    """Conteúdo de um arquivo (executado no pool de threads); None se ilegível
+
+    Retorna também se o conteúdo veio do CachingReader (sem nova leitura).
+    """
+    reader, rel_path = job
+    if isinstance(reader, CachingReader):
+        raw = reader.peek(rel_path)
+        if raw is not None:
+            return raw, True
+    try:
+        return reader.read_bytes(rel_path), False
+    except OSError:
+        return None, False
+
+
+class ImportIndex:
+    """Quais arquivos importam cada módulo (ou submódulo)
+
+    `files_importing('django')` inclui quem importa `django.db.models`.
+    Os arquivos ficam na ordem em que foram indexados (a do inventário).
+    """
+
+    def __init__(self):
+        self.files: Dict[str, List[str]] = {}  # caminho -> módulos importados
+        self._by_module: Dict[str, List[str]] = {}
+        self.coverage = 1.0
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def add(self, path: str, modules: Iterable[str]):
+        """Registrar os imports de um arquivo"""
+        modules = list(modules)
+        self.files[path] = modules
+        prefixes = set()
+        for module in modules:
+            parts = module.split('.')
+            prefixes.update('.'.join(parts[:level]) for level in range(1, len(parts) + 1))
+        for prefix in sorted(prefixes):
+            self._by_module.setdefault(prefix, []).append(path)
+
+    def files_importing(self, module: str) -> List[str]:
+        """Arquivos que importam o módulo ou algum submódulo dele"""
+        return self._by_module.get(module, [])
+
+
+def build_import_index(reader: object, entries: Sequence[FileEntry], workers: Optional[int] = None,
+                       cache: Optional[ScanCache] = None, budget: Optional[ScanBudget] = None,
+                       metrics: Optional[DetectionMetrics] = None, use_processes: bool = True) -> ImportIndex:
+    """Indexar os imports dos arquivos Python informados
+
+    Com `cache`, arquivos cujo tamanho/mtime não mudou nem são lidos. Os
+    demais são lidos em threads e procurados no cache pelo hash do conteúdo
+    (o que exige ler o arquivo inteiro: é o caso de revisões git e arquivos
+    compactados, que não têm mtime). Só conteúdos que não estão no cache nem
+    se repetem na própria execução são analisados, em um pool de processos
+    (`use_processes=False` usa threads; lotes pequenos ficam no próprio
+    processo). Com `budget`, as leituras são admitidas no orçamento (prazo e
+    limites de arquivos/bytes) e `coverage` registra a fração indexada. Com
+    um CachingReader, a busca por padrões reaproveita o conteúdo lido aqui
+    sem nova leitura nem nova contabilização no orçamento.
+    """
+    index = ImportIndex()
+    parsed: Dict[str, Optional[List[str]]] = {}  # hash -> imports, nesta execução
+    indexed = 0
+
+    with ContentScanPool(workers) as read_pool, ContentScanPool(workers, use_processes) as parse_pool:
+        for start in range(0, len(entries), IMPORT_BATCH_SIZE):
+            batch = entries[start:start + IMPORT_BATCH_SIZE]
+            found: List[Optional[List[str]]] = [None] * len(batch)
+
+            # Arquivos inalterados desde a última execução: imports direto do cache
+            pending: List[Tuple[int, Optional[os.stat_result]]] = []
+            for position, entry in enumerate(batch):
+                st = reader.stat(entry.path) if cache is not None else None
+                cached = cache.lookup_file('imports', IMPORT_CACHE_FINGERPRINT, entry.path, st) if st else None
+                if cached is not None:
+                    found[position] = cached
+                else:
+                    pending.append((position, st))
+
+            skipped = 0  # Deixados de fora pelo orçamento
+            if budget is not None:
+                admitted = budget.admit([batch[position] for position, _ in pending])
+                skipped = len(pending) - len(admitted)
+                pending = pending[:len(admitted)]
+            contents = read_pool.map(_read_content, [(reader, batch[position].path) for position, _ in pending])
+
+            digests: List[Optional[str]] = []
+            missing: Dict[str, bytes] = {}
+            for raw, cached in contents:
+                if raw is None:
+                    digests.append(None)
+                    continue
+                digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+                digests.append(digest)
+                if metrics is not None and not cached:
+                    metrics.count('files_read')
+                    metrics.count('bytes_read', len(raw))
+                if digest in parsed or digest in missing:
+                    continue
+                cached = cache.lookup_digest('imports', IMPORT_CACHE_FINGERPRINT, digest) if cache else None
+                if cached is not None:
+                    parsed[digest] = cached[0]
+                else:
+                    missing[digest] = raw
+
+            if missing:
+                pool = parse_pool if len(missing) >= PROCESS_POOL_THRESHOLD else ContentScanPool(1)
+                for digest, modules in zip(missing, pool.map(_parse_imports, list(missing.values()))):
+                    parsed[digest] = modules
+                    if cache is not None:
+                        cache.store_digest('imports', IMPORT_CACHE_FINGERPRINT, digest, [modules])
+                if metrics is not None:
+                    metrics.count('files_parsed', len(missing))
+
+            for (position, st), digest in zip(pending, digests):
+                if digest is None:
+                    continue
+                found[position] = parsed[digest]
+                if st is not None:
+                    cache.store_file('imports', IMPORT_CACHE_FINGERPRINT, batch[position].path, st, parsed[digest])
+
+            # Na ordem do inventário, para evidências determinísticas
+            for entry, modules in zip(batch, found):
+                if modules:
+                    index.add(entry.path, modules)
+            indexed += len(batch) - skipped
+            if skipped:
+                break
+
+    if entries:
+        index.coverage = indexed / len(entries)
+    return index
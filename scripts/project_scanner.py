@@ -0,0 +1,1395 @@
+#!/usr/bin/env python3
+"""
+AI Project Template - Project Scanner
+Inventário de arquivos compartilhado pelos detectores: o projeto é percorrido
+uma única vez e todas as fases de detecção consultam o inventário em memória.
+Diretórios ignorados (.gitignore, .ignore e lista de skip) nunca são visitados.
+"""
+
+import os
+import re
+import sys
+import stat
+import json
+import fnmatch
+import io
+import struct
+import tarfile
+import zipfile
+import heapq
+import hashlib
+import tempfile
+import time
+import threading
+import subprocess
+from collections import deque
+import contextlib
+from contextlib import contextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import asdict, dataclass, field
+
+# Diretórios que nunca são visitados durante a travessia
+DEFAULT_SKIP_DIRS = frozenset([
+    '__pycache__', 'node_modules', '.git', '.venv', 'venv',
+    'build', 'dist', 'target', '.pytest_cache', 'coverage'
+])
+
+# Arquivos de ignore respeitados em cada diretório
+IGNORE_FILES = ('.gitignore', '.ignore')
+
+# Bytes lidos (no máximo) de cada membro de arquivo compactado
+ARCHIVE_MEMBER_LIMIT = 1024 * 1024
+
+# Bytes iniciais inspecionados para reconhecer conteúdo binário
+BINARY_SNIFF_BYTES = 8192
+
+# Bytes de conteúdo mantidos em memória pelo CachingReader
+CONTENT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Bytes descartados por leitura ao pular o resto de um blob do `git cat-file --batch`
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Arquivos do índice git verificados (lstat) entre consultas ao prazo
+GIT_INDEX_BUDGET_INTERVAL = 1024
+
+# Caminhos de exemplo mantidos por item de evidência
+EVIDENCE_SAMPLE_SIZE = 10
+
+# Manifestos que delimitam um sub-projeto em monorepos
+MANIFEST_FILES = frozenset([
+    'package.json', 'pyproject.toml', 'setup.py', 'go.mod',
+    'Cargo.toml', 'pom.xml', 'build.gradle'
+])
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    """Arquivo encontrado na travessia do projeto"""
+    path: str       # Caminho relativo à raiz, sempre com '/'
+    name: str
+    extension: str  # Inclui o ponto ('.py'); vazio se não houver
+    size: int
+    depth: int      # 0 = arquivo na raiz do projeto
+
+
+def decode_text(raw: bytes) -> str:
+    """Decodificar UTF-8 com a mesma normalização de quebras de linha de read_text()"""
+    text = raw.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def decode_sample(raw: bytes, truncated: bool = False) -> Optional[str]:
+    """Decodificar conteúdo lido, possivelmente cortado em um limite, sem levantar exceção
+
+    Retorna None para conteúdo binário (byte NUL no início) ou que não é
+    UTF-8. Com `truncated`, um caractere multibyte cortado pelo limite de
+    leitura é descartado em vez de invalidar o arquivo inteiro.
+    """
+    if b'\0' in raw[:BINARY_SNIFF_BYTES]:
+        return None
+    try:
+        return decode_text(raw)
+    except UnicodeDecodeError as e:
+        if not truncated or e.reason != 'unexpected end of data':
+            return None
+        return decode_text(raw[:e.start])
+
+
+class FilesystemReader:
+    """Acesso ao conteúdo dos arquivos do inventário a partir do disco"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def read_bytes(self, rel_path: str, limit: Optional[int] = None) -> bytes:
+        """Conteúdo bruto (ou os primeiros `limit` bytes) de um arquivo"""
+        with open(self.root / rel_path, 'rb') as f:
+            return f.read() if limit is None else f.read(limit)
+
+    def read_text(self, rel_path: str) -> str:
+        """Conteúdo decodificado; levanta UnicodeDecodeError/OSError"""
+        return decode_text(self.read_bytes(rel_path))
+
+    def open_stream(self, rel_path: str) -> ContextManager[BinaryIO]:
+        """Arquivo aberto para leitura incremental (memória constante)"""
+        return open(self.root / rel_path, 'rb')
+
+    def stat(self, rel_path: str) -> Optional[os.stat_result]:
+        """Metadados para cache; None se o arquivo não existe"""
+        try:
+            return os.stat(self.root / rel_path)
+        except OSError:
+            return None
+
+    def list_root(self) -> Optional[List[str]]:
+        """Nomes na raiz do disco, sem filtro de ignore (arquivos e diretórios)"""
+        try:
+            return os.listdir(self.root)
+        except OSError:
+            return []
+
+    def for_subtree(self, prefix: str) -> 'FilesystemReader':
+        return FilesystemReader(self.root / prefix)
+
+
+class _BlobStream:
+    """Leitura limitada ao blob corrente da saída de `git cat-file --batch`
+
+    Nunca lê além dos `size` bytes do blob; `drain` descarta o que sobrou
+    (e a quebra de linha final) para manter o protocolo sincronizado.
+    """
+
+    def __init__(self, pipe: BinaryIO, size: int):
+        self._pipe = pipe
+        self._remaining = size
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._pipe.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        line = self._pipe.readline(size)
+        self._remaining -= len(line)
+        return line
+
+    def drain(self):
+        while self._remaining:
+            if not self.read(min(self._remaining, STREAM_CHUNK_SIZE)):
+                raise EOFError('git cat-file encerrou no meio de um blob')
+        self._pipe.read(1)
+
+
+class GitRevisionReader:
+    """Acesso ao conteúdo de uma revisão git via um único `git cat-file --batch`
+
+    Nenhum arquivo é materializado em disco. O processo é criado sob demanda
+    (também em cada processo de um pool) e protegido por lock entre threads.
+    Leituras com limite e em fluxo passam pelo mesmo processo, sem copiar o
+    blob inteiro para a memória.
+    """
+
+    def __init__(self, repo_path: Path, blobs: Dict[str, str], prefix: str = ''):
+        self.repo_path = Path(repo_path)
+        self.blobs = blobs  # caminho relativo à raiz do projeto -> id do blob
+        self.prefix = prefix
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'repo_path': self.repo_path, 'blobs': self.blobs, 'prefix': self.prefix}
+
+    def __setstate__(self, state):
+        self.__init__(state['repo_path'], state['blobs'], state['prefix'])
+
+    def __del__(self):
+        self.close()
+
+    def _request(self, rel_path: str) -> _BlobStream:
+        """Pedir um blob ao processo cat-file; chamar com `_lock` adquirido"""
+        blob = self.blobs.get(f"{self.prefix}/{rel_path}" if self.prefix else rel_path)
+        if blob is None:
+            raise FileNotFoundError(rel_path)
+        if self._process is None:
+            self._process = subprocess.Popen(
+                ['git', 'cat-file', '--batch'], cwd=self.repo_path,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        self._process.stdin.write(blob.encode('ascii') + b'\n')
+        self._process.stdin.flush()
+        header = self._process.stdout.readline().split()
+        if len(header) != 3:
+            raise FileNotFoundError(rel_path)
+        return _BlobStream(self._process.stdout, int(header[2]))
+
+    def read_bytes(self, rel_path: str, limit: Optional[int] = None) -> bytes:
+        """Conteúdo do blob (ou os primeiros `limit` bytes) de um arquivo da revisão"""
+        with self._lock:
+            stream = self._request(rel_path)
+            data = stream.read(-1 if limit is None else limit)
+            stream.drain()
+        return data
+
+    def read_text(self, rel_path: str) -> str:
+        """Conteúdo decodificado; levanta UnicodeDecodeError/OSError"""
+        return decode_text(self.read_bytes(rel_path))
+
+    @contextmanager
+    def open_stream(self, rel_path: str) -> Iterator[BinaryIO]:
+        """Blob lido em fluxo pelo processo cat-file, que fica reservado até sair"""
+        with self._lock:
+            stream = self._request(rel_path)
+            try:
+                yield stream
+            finally:
+                stream.drain()
+
+    def stat(self, rel_path: str) -> Optional[os.stat_result]:
+        return None  # Blobs são imutáveis: não há o que invalidar
+
+    def list_root(self) -> Optional[List[str]]:
+        return None  # A revisão só tem o que foi inventariado
+
+    def for_subtree(self, prefix: str) -> 'GitRevisionReader':
+        return GitRevisionReader(self.repo_path, self.blobs, f"{self.prefix}/{prefix}" if self.prefix else prefix)
+
+    def close(self):
+        """Encerrar o processo cat-file, se iniciado"""
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+            self._process = None
+
+
+class ArchiveReader:
+    """Acesso ao conteúdo de membros de um .zip/.tar sem extração em disco
+
+    Membros de tar (lidos em fluxo) são guardados em memória durante a
+    listagem; membros de zip são descompactados sob demanda. Em ambos os
+    casos só os primeiros `member_limit` bytes de cada membro são lidos.
+    """
+
+    def __init__(self, contents: Dict[str, bytes], zip_source: Any = None,
+                 members: Optional[Dict[str, str]] = None, prefix: str = '',
+                 member_limit: int = ARCHIVE_MEMBER_LIMIT):
+        self.contents = contents      # caminho -> bytes (tar)
+        self.zip_source = zip_source  # caminho do .zip ou bytes (stdin)
+        self.members = members or {}  # caminho -> nome do membro no zip
+        self.prefix = prefix
+        self.member_limit = member_limit
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {key: getattr(self, key) for key in ('contents', 'zip_source', 'members', 'prefix', 'member_limit')}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def read_bytes(self, rel_path: str, limit: Optional[int] = None) -> bytes:
+        """Conteúdo (limitado) de um membro; FileNotFoundError se não foi selecionado"""
+        path = f"{self.prefix}/{rel_path}" if self.prefix else rel_path
+        limit = self.member_limit if limit is None else min(limit, self.member_limit)
+
+        if path in self.contents:
+            return self.contents[path][:limit]
+        if path not in self.members or self.zip_source is None:
+            raise FileNotFoundError(rel_path)
+
+        with self._lock:
+            if self._zip is None:
+                source = self.zip_source
+                self._zip = zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source)
+            with self._zip.open(self.members[path]) as member:
+                return member.read(limit)
+
+    def read_text(self, rel_path: str) -> str:
+        """Conteúdo decodificado; levanta UnicodeDecodeError/OSError"""
+        return decode_text(self.read_bytes(rel_path))
+
+    def open_stream(self, rel_path: str) -> ContextManager[BinaryIO]:
+        """Membro como fluxo (já limitado a `member_limit` bytes)"""
+        return io.BytesIO(self.read_bytes(rel_path))
+
+    def stat(self, rel_path: str) -> Optional[os.stat_result]:
+        return None  # Conteúdo de arquivo compactado não é cacheado
+
+    def list_root(self) -> Optional[List[str]]:
+        return None  # O arquivo compactado só tem o que foi inventariado
+
+    def for_subtree(self, prefix: str) -> 'ArchiveReader':
+        return ArchiveReader(
+            self.contents, self.zip_source, self.members,
+            f"{self.prefix}/{prefix}" if self.prefix else prefix, self.member_limit
+        )
+
+
+class CachingReader:
+    """Leitor que guarda em memória o conteúdo já lido de outro leitor
+
+    Permite que vários detectores sobre o mesmo inventário leiam cada
+    arquivo do disco uma única vez: uma leitura limitada é servida de uma
+    leitura anterior maior (ou completa) do mesmo arquivo. Ao atingir
+    `max_bytes`, novos conteúdos deixam de ser guardados. Em um pool de
+    processos cada processo recebe o leitor original com o cache vazio.
+    """
+
+    def __init__(self, reader: Any, max_bytes: int = CONTENT_CACHE_BYTES):
+        self.reader = reader
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._contents: Dict[str, Tuple[bytes, bool]] = {}  # caminho -> (bytes, completo)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'reader': self.reader, 'max_bytes': self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def read_bytes(self, rel_path: str, limit: Optional[int] = None) -> bytes:
+        """Conteúdo bruto (ou os primeiros `limit` bytes), do cache quando possível"""
+        cached = self._contents.get(rel_path)
+        if cached is not None:
+            raw, complete = cached
+            if complete or (limit is not None and len(raw) >= limit):
+                with self._lock:
+                    self.hits += 1
+                return raw if limit is None else raw[:limit]
+
+        raw = self.reader.read_bytes(rel_path, limit)
+        complete = limit is None or len(raw) < limit
+        with self._lock:
+            self.misses += 1
+            previous = self._contents.get(rel_path)
+            extra = len(raw) - (len(previous[0]) if previous else 0)
+            if extra > 0 and self._size + extra <= self.max_bytes:
+                self._contents[rel_path] = (raw, complete)
+                self._size += extra
+        return raw
+
+    def peek(self, rel_path: str, limit: Optional[int] = None) -> Optional[bytes]:
+        """Conteúdo (ou os primeiros `limit` bytes) se já estiver em cache; None caso contrário
+
+        Não acessa o leitor original nem conta acerto/falha: permite enviar a
+        um pool de processos o conteúdo já lido, em vez do leitor.
+        """
+        cached = self._contents.get(rel_path)
+        if cached is None:
+            return None
+        raw, complete = cached
+        if complete or (limit is not None and len(raw) >= limit):
+            return raw if limit is None else raw[:limit]
+        return None
+
+    def read_text(self, rel_path: str) -> str:
+        """Conteúdo decodificado; levanta UnicodeDecodeError/OSError"""
+        return decode_text(self.read_bytes(rel_path))
+
+    def open_stream(self, rel_path: str) -> ContextManager[BinaryIO]:
+        """Fluxo direto do leitor original: conteúdo lido em fluxo não é guardado"""
+        return self.reader.open_stream(rel_path)
+
+    def stat(self, rel_path: str) -> Optional[os.stat_result]:
+        return self.reader.stat(rel_path)
+
+    def list_root(self) -> Optional[List[str]]:
+        return self.reader.list_root()
+
+    def for_subtree(self, prefix: str) -> 'CachingReader':
+        return CachingReader(self.reader.for_subtree(prefix), self.max_bytes)
+
+
+class FileInventory:
+    """Inventário em memória dos arquivos e diretórios de um projeto"""
+
+    def __init__(self, root: Path, entries: List[FileEntry], directories: List[str], reader=None):
+        """Indexar entradas por nome e extensão"""
+        self.root = root
+        self.entries = entries
+        self.directories = directories
+        # Conteúdo é sempre lido através do reader (disco, revisão git...)
+        self.reader = reader if reader is not None else FilesystemReader(root)
+        # Fração dos diretórios percorrida (< 1 se a travessia foi interrompida)
+        self.coverage = 1.0
+        self._by_name: Dict[str, List[FileEntry]] = {}
+        self._by_extension: Dict[str, List[FileEntry]] = {}
+
+        for entry in entries:
+            self._by_name.setdefault(entry.name, []).append(entry)
+            if entry.extension:
+                self._by_extension.setdefault(entry.extension, []).append(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[FileEntry]:
+        return iter(self.entries)
+
+    def by_name(self, name: str) -> List[FileEntry]:
+        """Arquivos com nome exato (equivalente a glob('**/name'))"""
+        return self._by_name.get(name, [])
+
+    def names(self) -> Iterable[str]:
+        """Nomes de arquivo distintos do inventário"""
+        return self._by_name.keys()
+
+    def by_extension(self, extension: str) -> List[FileEntry]:
+        """Arquivos com a extensão informada (equivalente a glob('**/*.ext'))"""
+        return self._by_extension.get(extension, [])
+
+    def match(self, pattern: str) -> List[FileEntry]:
+        """Arquivos cujo nome casa com o padrão (ex: 'setup.py', '*.csproj', 'test_*.py')"""
+        if not any(char in pattern for char in '*?['):
+            return self.by_name(pattern)
+
+        matches = []
+        for name in fnmatch.filter(self._by_name, pattern):
+            matches.extend(self._by_name[name])
+        return sorted(matches, key=lambda e: e.path)
+
+    def match_directories(self, pattern: str) -> List[str]:
+        """Diretórios que terminam com o padrão (ex: 'api/', 'src/lib/')"""
+        suffix = pattern.strip('/')
+        return [
+            d for d in self.directories
+            if d == suffix or d.endswith('/' + suffix)
+        ]
+
+    def partition(self, prefixes: Iterable[str]) -> Dict[str, 'FileInventory']:
+        """Visões re-enraizadas do inventário para cada diretório em `prefixes`
+
+        Cada visão contém todo o conteúdo abaixo do diretório (inclusive de
+        sub-projetos aninhados), sem nova travessia do disco.
+        """
+        prefixes = set(prefixes)
+        files: Dict[str, List[FileEntry]] = {prefix: [] for prefix in prefixes}
+        dirs: Dict[str, List[str]] = {prefix: [] for prefix in prefixes}
+
+        for entry in self.entries:
+            parts = entry.path.split('/')
+            for level in range(1, len(parts)):
+                prefix = '/'.join(parts[:level])
+                if prefix in files:
+                    files[prefix].append(FileEntry(
+                        path='/'.join(parts[level:]),
+                        name=entry.name,
+                        extension=entry.extension,
+                        size=entry.size,
+                        depth=entry.depth - level
+                    ))
+
+        for directory in self.directories:
+            parts = directory.split('/')
+            for level in range(1, len(parts)):
+                prefix = '/'.join(parts[:level])
+                if prefix in dirs:
+                    dirs[prefix].append('/'.join(parts[level:]))
+
+        views = {
+            prefix: FileInventory(
+                self.root / prefix, files[prefix], dirs[prefix], self.reader.for_subtree(prefix)
+            )
+            for prefix in prefixes
+        }
+        for view in views.values():
+            view.coverage = self.coverage
+        return views
+
+
+class EventEmitter:
+    """Eventos de progresso e evidência em NDJSON (um objeto JSON por linha)
+
+    Cada linha tem `event` (tipo) e `t` (segundos desde o início) e é
+    enviada imediatamente, para que um orquestrador acompanhe o progresso,
+    use evidências parciais ou cancele a execução sem esperar o resultado.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **data):
+        """Enviar um evento"""
+        record = {'event': event, 't': round(time.monotonic() - self.started, 6), **data}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Delimitar uma fase com eventos phase_start/phase_end (com duração)"""
+        start = time.perf_counter()
+        self.emit('phase_start', phase=name)
+        try:
+            yield
+        finally:
+            self.emit('phase_end', phase=name, elapsed_seconds=round(time.perf_counter() - start, 6))
+
+
+class DetectionMetrics:
+    """Tempos por fase (relógio e CPU) e contadores de uma detecção
+
+    O tempo de CPU é o do processo atual: trabalho feito em um pool de
+    processos aparece apenas no tempo de relógio da fase.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """Acumular tempo de relógio e de CPU de uma fase"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            totals = self.phases.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+            totals['wall_seconds'] += time.perf_counter() - wall
+            totals['cpu_seconds'] += time.process_time() - cpu
+
+    def count(self, name: str, amount: int = 1):
+        """Incrementar um contador"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Métricas serializáveis (tempos arredondados em microssegundos)"""
+        return {
+            'phases': {
+                name: {key: round(value, 6) for key, value in totals.items()}
+                for name, totals in self.phases.items()
+            },
+            'counters': dict(sorted(self.counters.items()))
+        }
+
+
+def result_to_dict(result: Any) -> Any:
+    """asdict() de um resultado, omitindo blocos `metrics` não coletados"""
+    def prune(value):
+        if isinstance(value, dict):
+            return {key: prune(item) for key, item in value.items() if not (key == 'metrics' and item is None)}
+        if isinstance(value, list):
+            return [prune(item) for item in value]
+        return value
+    return prune(asdict(result))
+
+
+class EvidenceSample:
+    """Contagem exata de evidências com uma amostra limitada e determinística
+
+    A amostra é o bottom-k por hash estável do caminho: a mesma árvore
+    sempre produz os mesmos exemplos, independente da ordem de inserção, e a
+    memória fica constante qualquer que seja o número de caminhos.
+    """
+
+    def __init__(self, size: int = EVIDENCE_SAMPLE_SIZE):
+        self.size = size
+        self.count = 0
+        self._heap: List[Tuple[int, str]] = []  # (-hash, caminho): maior hash no topo
+
+    def add(self, path: str):
+        """Contar um caminho e considerá-lo para a amostra"""
+        self.count += 1
+        key = int.from_bytes(hashlib.blake2b(path.encode('utf-8'), digest_size=8).digest(), 'big')
+        if len(self._heap) < self.size:
+            if (-key, path) not in self._heap:
+                heapq.heappush(self._heap, (-key, path))
+        elif key < -self._heap[0][0] and (-key, path) not in self._heap:
+            heapq.heapreplace(self._heap, (-key, path))
+
+    def extend(self, paths: Iterable[str]):
+        for path in paths:
+            self.add(path)
+
+    @property
+    def sample(self) -> List[str]:
+        """Caminhos amostrados, em ordem alfabética"""
+        return sorted(path for _, path in self._heap)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'sample': self.sample}
+
+
+class ScanBudget:
+    """Prazo e limites de leitura de uma detecção interrompível
+
+    As fases consultam o orçamento antes de cada lote de arquivos; ao
+    esgotá-lo, param e a detecção devolve o melhor resultado até ali,
+    marcado como parcial. `deadline` é contado em segundos a partir da
+    criação do orçamento.
+    """
+
+    def __init__(self, deadline: Optional[float] = None, max_files: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
+        self.deadline = deadline
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.started = time.monotonic()
+        self.files_read = 0
+        self.bytes_read = 0
+        self.exhausted = False
+        self._admitted: Dict[str, Optional[int]] = {}  # caminho -> limite já contabilizado (None = inteiro)
+
+    def expired(self) -> bool:
+        """Verificar (e registrar) se o prazo terminou"""
+        if self.deadline is not None and time.monotonic() - self.started >= self.deadline:
+            self.exhausted = True
+        return self.exhausted
+
+    def admit(self, entries: Sequence[FileEntry], limit: Optional[int] = None) -> List[FileEntry]:
+        """Maior prefixo de `entries` que cabe no orçamento, já contabilizado
+
+        `limit` é o máximo de bytes lidos de cada arquivo. Uma lista menor
+        que a pedida significa que o orçamento se esgotou. Um arquivo já
+        admitido com leitura igual ou maior não é contabilizado de novo (o
+        conteúdo é compartilhado via CachingReader), e é admitido mesmo com
+        os limites de arquivos/bytes esgotados; com o prazo, nada mais entra.
+        """
+        if self.deadline is not None and time.monotonic() - self.started >= self.deadline:
+            self.exhausted = True
+            return []
+
+        admitted: List[FileEntry] = []
+        for entry in entries:
+            if entry.path in self._admitted:
+                previous = self._admitted[entry.path]
+                if previous is None or (limit is not None and limit <= previous):
+                    admitted.append(entry)
+                    continue
+            size = entry.size if limit is None else min(entry.size, limit)
+            if ((self.max_files is not None and self.files_read >= self.max_files)
+                    or (self.max_bytes is not None and self.bytes_read + size > self.max_bytes)):
+                self.exhausted = True
+                break
+            self.files_read += 1
+            self.bytes_read += size
+            self._admitted[entry.path] = limit
+            admitted.append(entry)
+        return admitted
+
+
+@dataclass
+class SubprojectResult:
+    """Resultado de detecção de um sub-projeto e de seus sub-projetos aninhados"""
+    path: str  # Relativo à raiz do monorepo; '' = raiz
+    result: Any
+    subprojects: List['SubprojectResult'] = field(default_factory=list)
+
+
+def discover_subprojects(inventory: FileInventory) -> List[str]:
+    """Diretórios (abaixo da raiz) que contêm um manifesto de projeto"""
+    return sorted({
+        entry.path.rsplit('/', 1)[0]
+        for entry in inventory
+        if entry.depth > 0 and entry.name in MANIFEST_FILES
+    })
+
+
+def build_subproject_tree(results: Dict[str, Any]) -> SubprojectResult:
+    """Montar árvore a partir de {caminho: resultado}; '' deve ser a raiz"""
+    nodes = {path: SubprojectResult(path, result) for path, result in results.items()}
+    for path in sorted(nodes):
+        if not path:
+            continue
+        parent = path
+        while parent:
+            parent = parent.rsplit('/', 1)[0] if '/' in parent else ''
+            if parent in nodes:
+                nodes[parent].subprojects.append(nodes[path])
+                break
+    return nodes['']
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    """Regra de um arquivo .gitignore/.ignore"""
+    base: str        # Diretório (relativo) onde o arquivo de ignore está
+    regex: re.Pattern
+    negated: bool
+    dir_only: bool
+
+
+class IgnoreRules:
+    """Conjunto de regras no estilo gitignore herdadas ao longo da travessia"""
+
+    def __init__(self, rules: Tuple[IgnoreRule, ...] = ()):
+        self.rules = rules
+
+    def extend(self, base: str, lines: Iterable[str]) -> 'IgnoreRules':
+        """Criar novo conjunto com as regras de um arquivo de ignore em `base`"""
+        new_rules = [rule for rule in (self._parse_line(base, line) for line in lines) if rule]
+        if not new_rules:
+            return self
+        return IgnoreRules(self.rules + tuple(new_rules))
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Verificar caminho relativo à raiz; a última regra que casa vence"""
+        ignored = False
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            path = rel_path[len(rule.base) + 1:] if rule.base else rel_path
+            if rule.regex.fullmatch(path):
+                ignored = not rule.negated
+        return ignored
+
+    @staticmethod
+    def _parse_line(base: str, line: str) -> Optional[IgnoreRule]:
+        """Converter uma linha de .gitignore em regra"""
+        line = line.rstrip('\n').rstrip()
+        if not line or line.startswith('#'):
+            return None
+
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\'):
+            line = line[1:]
+
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        anchored = '/' in line
+        line = line.lstrip('/')
+        if not line:
+            return None
+
+        regex = _translate_ignore_pattern(line)
+        if not anchored:
+            regex = '(?:.*/)?' + regex
+        return IgnoreRule(base, re.compile(regex), negated, dir_only)
+
+
+def _translate_ignore_pattern(pattern: str) -> str:
+    """Traduzir glob do gitignore (com suporte a **) para regex"""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            parts.append('/.*')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[':
+            end = pattern.find(']', i + 2)
+            if end == -1:
+                parts.append(re.escape('['))
+                i += 1
+            else:
+                content = pattern[i + 1:end].replace('\\', '\\\\')
+                if content.startswith('!'):
+                    content = '^' + content[1:]
+                parts.append(f'[{content}]')
+                i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(parts)
+
+
+def _read_ignore_file(path: Path) -> List[str]:
+    """Ler linhas de um arquivo de ignore, tolerando erros"""
+    try:
+        return path.read_text(encoding='utf-8', errors='replace').splitlines()
+    except OSError:
+        return []
+
+
+class ScanCache:
+    """Cache persistente da travessia e de evidências por arquivo
+
+    Listagens de diretório são reaproveitadas enquanto mtime/inode do
+    diretório não mudam; evidências por arquivo enquanto tamanho/mtime do
+    arquivo não mudam, ou, para evidências por hash, enquanto o conteúdo
+    for o mesmo (vale também para revisões git e arquivos compactados).
+    Entradas não visitadas na execução são descartadas.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        """Carregar cache existente (se houver) do caminho informado"""
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._dirs: Dict[str, list] = {}
+        self._sections: Dict[str, dict] = {}
+        self._new_dirs: Dict[str, list] = {}
+        self._new_sections: Dict[str, dict] = {}
+        self._load()
+
+    @classmethod
+    def for_project(cls, project_path: Path, tool: str = '') -> 'ScanCache':
+        """Cache no diretório de cache do usuário, fora do repositório analisado
+
+        Ferramentas executadas separadamente usam `tool` distintos: cada
+        gravação descarta as seções que a execução não visitou.
+        """
+        # SECURITY: Fora do projeto e em diretório privado (0o700) do usuário
+        root = str(Path(project_path).resolve())
+        key = hashlib.sha1(root.encode('utf-8')).hexdigest()[:16]
+        name = f"{key}-{tool}.json" if tool else f"{key}.json"
+        return cls(_user_cache_dir() / name)
+
+    def _load(self):
+        """Ler cache do disco, ignorando arquivos corrompidos ou de outra versão"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != self.VERSION:
+            return
+        self._dirs = data.get('dirs', {})
+        self._sections = data.get('sections', {})
+
+    def lookup_dir(self, rel_dir: str, st: os.stat_result) -> Optional[List[list]]:
+        """Listagem em cache de um diretório, se mtime/inode não mudaram"""
+        cached = self._dirs.get(rel_dir)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_ino:
+            self.hits += 1
+            self._new_dirs[rel_dir] = cached
+            return cached[2]
+        self.misses += 1
+        return None
+
+    def store_dir(self, rel_dir: str, st: os.stat_result, listing: List[list]):
+        """Registrar listagem de um diretório"""
+        self._new_dirs[rel_dir] = [st.st_mtime_ns, st.st_ino, listing]
+
+    def lookup_file(self, section: str, fingerprint: str, rel_path: str,
+                    st: os.stat_result) -> Optional[Any]:
+        """Evidência em cache de um arquivo, se tamanho/mtime não mudaram"""
+        cached_section = self._sections.get(section)
+        if not cached_section or cached_section.get('fingerprint') != fingerprint:
+            self.misses += 1
+            return None
+        cached = cached_section['files'].get(rel_path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            self.hits += 1
+            self._new_section(section, fingerprint)[rel_path] = cached
+            return cached[2]
+        self.misses += 1
+        return None
+
+    def store_file(self, section: str, fingerprint: str, rel_path: str,
+                   st: os.stat_result, data: Any):
+        """Registrar evidência de um arquivo (precisa ser serializável em JSON)"""
+        self._new_section(section, fingerprint)[rel_path] = [st.st_size, st.st_mtime_ns, data]
+
+    def lookup_digest(self, section: str, fingerprint: str, digest: str) -> Optional[Any]:
+        """Evidência em cache para um conteúdo, pelo hash"""
+        cached_section = self._sections.get(section)
+        if not cached_section or cached_section.get('fingerprint') != fingerprint:
+            self.misses += 1
+            return None
+        cached = cached_section.get('digests', {}).get(digest)
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._new_section(section, fingerprint, 'digests')[digest] = cached
+        return cached
+
+    def store_digest(self, section: str, fingerprint: str, digest: str, data: Any):
+        """Registrar evidência de um conteúdo pelo hash (serializável em JSON)"""
+        self._new_section(section, fingerprint, 'digests')[digest] = data
+
+    def _new_section(self, section: str, fingerprint: str, kind: str = 'files') -> dict:
+        new = self._new_sections.setdefault(section, {'fingerprint': fingerprint, 'files': {}})
+        return new.setdefault(kind, {})
+
+    def save(self):
+        """Gravar cache de forma atômica; falhas de escrita não interrompem a detecção"""
+        data = {'version': self.VERSION, 'dirs': self._new_dirs, 'sections': self._new_sections}
+        tmp_path = None
+        try:
+            self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # Arquivo temporário exclusivo (O_EXCL, 0o600): execuções concorrentes
+            # não se sobrepõem e um symlink plantado no caminho não é seguido
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix='.tmp', dir=self.path.parent)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            if tmp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_path)
+            print(f"⚠️  Não foi possível gravar cache de detecção: {e}", file=sys.stderr)
+
+
+def _user_cache_dir() -> Path:
+    """Diretório privado de cache do usuário atual
+
+    $XDG_CACHE_HOME (ou ~/.cache)/ai-template-detect-cache; sem home
+    utilizável, um diretório no temporário com o uid no nome. Um diretório
+    só é aceito se for do usuário, não for symlink e não der acesso a
+    outros usuários; sem nenhum assim, o cache vai para um diretório
+    temporário novo (e não persiste entre execuções).
+    """
+    uid = os.getuid() if hasattr(os, 'getuid') else None
+    candidates = []
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    if os.path.isabs(base):
+        candidates.append(Path(base) / 'ai-template-detect-cache')
+    suffix = f"-{uid}" if uid is not None else ''
+    candidates.append(Path(tempfile.gettempdir()) / f"ai-template-detect-cache{suffix}")
+
+    for directory in candidates:
+        try:
+            directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            st = os.lstat(directory)
+        except OSError:
+            continue
+        if not stat.S_ISDIR(st.st_mode) or (uid is not None and st.st_uid != uid):
+            continue
+        if st.st_mode & 0o077:
+            try:
+                os.chmod(directory, 0o700)
+            except OSError:
+                continue
+        return directory
+    return Path(tempfile.mkdtemp(prefix='ai-template-detect-cache-'))
+
+
+def rules_fingerprint(rules: Any) -> str:
+    """Impressão digital de uma tabela de regras, para invalidar evidências em cache"""
+    return hashlib.sha1(json.dumps(rules, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _list_directory(dir_path: Path) -> List[list]:
+    """Listar diretório como [nome, é_diretório, tamanho], ordenado por nome"""
+    listing = []
+    with os.scandir(dir_path) as it:
+        for item in it:
+            try:
+                if item.is_dir(follow_symlinks=False):
+                    listing.append([item.name, True, 0])
+                elif item.is_file():
+                    listing.append([item.name, False, item.stat().st_size])
+            except OSError:
+                continue
+    listing.sort()
+    return listing
+
+
+def _find_git_dir(root: Path) -> Optional[Path]:
+    """Diretório git de uma work tree (suporta `.git` como arquivo em worktrees)"""
+    dot_git = root / '.git'
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        try:
+            content = dot_git.read_text(encoding='utf-8').strip()
+        except OSError:
+            return None
+        if content.startswith('gitdir:'):
+            git_dir = Path(content[len('gitdir:'):].strip())
+            return git_dir if git_dir.is_absolute() else (root / git_dir).resolve()
+    return None
+
+
+def _uses_sha256(git_dir: Path) -> bool:
+    """Verificar se o repositório usa objetos SHA-256 (entradas de índice maiores)"""
+    try:
+        config = (git_dir / 'config').read_text(encoding='utf-8', errors='replace')
+    except OSError:
+        return False
+    return re.search(r'objectformat\s*=\s*sha256', config, re.IGNORECASE) is not None
+
+
+def read_git_index(index_path: Path) -> List[Tuple[str, int]]:
+    """Ler (caminho, tamanho) de cada arquivo rastreado direto do .git/index
+
+    Suporta as versões 2, 3 e 4 do formato. Submódulos e entradas marcadas
+    como skip-worktree são ignorados. Índices divididos ou esparsos (que
+    não listam todos os arquivos) geram ValueError.
+    """
+    data = Path(index_path).read_bytes()
+    if len(data) < 12 or data[:4] != b'DIRC':
+        raise ValueError("Índice git inválido")
+    version, count = struct.unpack('>II', data[4:12])
+    if version not in (2, 3, 4):
+        raise ValueError(f"Versão de índice git não suportada: {version}")
+
+    files: Dict[str, int] = {}
+    pos = 12
+    previous = b''
+    for _ in range(count):
+        start = pos
+        mode, size = struct.unpack('>I8xI', data[pos + 24:pos + 40])
+        flags, = struct.unpack('>H', data[pos + 60:pos + 62])
+        pos += 62
+        skip_worktree = False
+        if flags & 0x4000 and version >= 3:
+            extended, = struct.unpack('>H', data[pos:pos + 2])
+            skip_worktree = bool(extended & 0x4000)
+            pos += 2
+
+        if version == 4:
+            # Nome comprimido: remove N bytes do nome anterior e acrescenta o sufixo
+            byte = data[pos]
+            pos += 1
+            strip = byte & 0x7f
+            while byte & 0x80:
+                byte = data[pos]
+                pos += 1
+                strip = ((strip + 1) << 7) | (byte & 0x7f)
+            end = data.index(b'\0', pos)
+            name = previous[:len(previous) - strip] + data[pos:end]
+            pos = end + 1
+        else:
+            end = data.index(b'\0', pos)
+            name = data[pos:end]
+            # Entradas são alinhadas em 8 bytes (com ao menos um NUL)
+            pos = start + ((end - start + 8) // 8) * 8
+        previous = name
+
+        object_type = mode >> 12
+        if object_type == 0o04:
+            raise ValueError("Índice git esparso não suportado")
+        if object_type in (0o10, 0o12) and not skip_worktree:  # Arquivo regular ou symlink
+            files[name.decode('utf-8', 'surrogateescape')] = size
+
+    # Extensões até o checksum final
+    while pos + 8 <= len(data) - 20:
+        signature = data[pos:pos + 4]
+        if signature in (b'link', b'sdir'):
+            raise ValueError("Índice git dividido/esparso não suportado")
+        ext_size, = struct.unpack('>I', data[pos + 4:pos + 8])
+        pos += 8 + ext_size
+
+    return list(files.items())
+
+
+def scan_git_revision(project_path: Path, rev: str,
+                      skip_dirs: Optional[Iterable[str]] = None) -> FileInventory:
+    """Montar o inventário de uma revisão git sem checkout
+
+    A árvore vem de um único `git ls-tree -r -l`; o conteúdo é lido sob
+    demanda por um GitRevisionReader. Levanta ValueError se a revisão não
+    existir.
+    """
+    root = Path(project_path).resolve()
+    result = subprocess.run(
+        ['git', 'ls-tree', '-r', '-l', '-z', rev], cwd=root,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    if result.returncode != 0:
+        raise ValueError(f"Revisão git inválida '{rev}': {result.stderr.decode(errors='replace').strip()}")
+
+    files = []
+    blobs: Dict[str, str] = {}
+    for record in result.stdout.split(b'\0'):
+        if not record:
+            continue
+        meta, _, name = record.partition(b'\t')
+        _, object_type, blob, size = meta.split()
+        if object_type != b'blob':
+            continue  # Submódulos
+        path = name.decode('utf-8', 'surrogateescape')
+        files.append((path, int(size)))
+        blobs[path] = blob.decode('ascii')
+
+    return _inventory_from_files(root, files, skip_dirs, GitRevisionReader(root, blobs))
+
+
+def _git_ls_files(root: Path) -> List[str]:
+    """Listar caminhos rastreados via `git ls-files -z`"""
+    process = subprocess.Popen(
+        ['git', 'ls-files', '-z', '--cached'], cwd=root,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    paths = []
+    buffer = b''
+    for chunk in iter(lambda: process.stdout.read(65536), b''):
+        buffer += chunk
+        *names, buffer = buffer.split(b'\0')
+        paths.extend(name.decode('utf-8', 'surrogateescape') for name in names)
+    if process.wait() != 0:
+        raise OSError("git ls-files falhou")
+    return paths
+
+
+def scan_git_index(project_path: Path, skip_dirs: Optional[Iterable[str]] = None,
+                   budget: Optional[ScanBudget] = None, events: Optional[EventEmitter] = None,
+                   metrics: Optional[DetectionMetrics] = None) -> Optional[FileInventory]:
+    """Montar o inventário a partir dos arquivos rastreados pelo git, sem travessia
+
+    Arquivos não rastreados (build, dependências instaladas) ficam de fora.
+    Cada arquivo rastreado passa por um lstat: os removidos da work tree são
+    descartados e os tamanhos são os atuais, não os registrados no índice.
+    Se o prazo de `budget` terminar, os arquivos restantes ficam de fora e
+    `coverage` indica a fração verificada. Com `events`, cada diretório do
+    inventário gera um evento 'directory'; com `metrics`, os lstat são
+    contados em 'files_stated'. O cache de listagens não se aplica (nenhum
+    diretório é listado). Retorna None se o projeto não for uma work tree
+    git utilizável.
+    """
+    root = Path(project_path).resolve()
+    git_dir = _find_git_dir(root)
+    if git_dir is None:
+        return None
+
+    try:
+        if _uses_sha256(git_dir):
+            raise ValueError("Índice com hashes SHA-256")
+        paths = [path for path, _ in read_git_index(git_dir / 'index')]
+    except (OSError, ValueError, IndexError, struct.error):
+        try:
+            paths = _git_ls_files(root)
+        except OSError:
+            return None
+    if not paths:
+        return None
+
+    # Diretórios ignorados são descartados antes do lstat
+    skip = DEFAULT_SKIP_DIRS if skip_dirs is None else frozenset(skip_dirs)
+    paths = [path for path in paths if not any(part in skip for part in path.split('/')[:-1])]
+
+    files = []
+    checked = 0
+    for path in paths:
+        if checked % GIT_INDEX_BUDGET_INTERVAL == 0 and budget is not None and budget.expired():
+            break
+        checked += 1
+        try:
+            st = os.lstat(root / path)
+        except OSError:
+            continue  # Rastreado, mas removido da work tree
+        files.append((path, st.st_size))
+    if metrics is not None:
+        metrics.count('files_stated', checked)
+
+    inventory = _inventory_from_files(root, files, skip_dirs)
+    if paths:
+        inventory.coverage = checked / len(paths)
+    if events is not None:
+        events.emit('directory', path='', depth=0)
+        for directory in inventory.directories:
+            events.emit('directory', path=directory, depth=directory.count('/') + 1)
+    return inventory
+
+
+def _inventory_from_files(root: Path, files: List[Tuple[str, int]],
+                          skip_dirs: Optional[Iterable[str]] = None, reader=None) -> FileInventory:
+    """Montar inventário a partir de uma lista (caminho, tamanho) já enumerada"""
+    skip = DEFAULT_SKIP_DIRS if skip_dirs is None else frozenset(skip_dirs)
+    entries: List[FileEntry] = []
+    directories = set()
+    for path, size in files:
+        parts = path.split('/')
+        if any(part in skip for part in parts[:-1]):
+            continue
+        for level in range(1, len(parts)):
+            directories.add('/'.join(parts[:level]))
+        entries.append(FileEntry(
+            path=path,
+            name=parts[-1],
+            extension=os.path.splitext(parts[-1])[1],
+            size=size,
+            depth=len(parts) - 1
+        ))
+
+    # Mesma ordem da travessia em largura: profundidade, depois caminho
+    entries.sort(key=lambda e: (e.depth, e.path.split('/')))
+    return FileInventory(
+        root, entries, sorted(directories, key=lambda d: (d.count('/'), d.split('/'))), reader
+    )
+
+
+def is_archive(path: str) -> bool:
+    """Verificar se o caminho é um .zip/.tar(.gz/.bz2/.xz) ou '-' (stdin)"""
+    if path == '-':
+        return True
+    return os.path.isfile(path) and (zipfile.is_zipfile(path) or tarfile.is_tarfile(path))
+
+
+def scan_archive(archive_path: str, skip_dirs: Optional[Iterable[str]] = None,
+                 wanted: Optional[Callable[[str], bool]] = None,
+                 member_limit: int = ARCHIVE_MEMBER_LIMIT) -> FileInventory:
+    """Montar o inventário a partir de um arquivo compactado, sem extração
+
+    `archive_path` pode ser '-' para ler de stdin. Só membros aceitos por
+    `wanted(caminho)` têm conteúdo lido, até `member_limit` bytes cada. Um
+    diretório de topo comum a todos os membros (ex: 'projeto-1.0/') é
+    removido dos caminhos.
+    """
+    if archive_path == '-':
+        stream = sys.stdin.buffer
+        head = stream.peek(4)[:4] if hasattr(stream, 'peek') else b''
+        if head.startswith(b'PK'):
+            # O índice do zip fica no final: precisa do conteúdo inteiro em memória
+            zip_source: Any = stream.read()
+        else:
+            return _scan_tar(tarfile.open(fileobj=stream, mode='r|*'), '-', skip_dirs, wanted, member_limit)
+    elif zipfile.is_zipfile(archive_path):
+        zip_source = str(Path(archive_path).resolve())
+    else:
+        return _scan_tar(tarfile.open(archive_path, mode='r|*'), archive_path, skip_dirs, wanted, member_limit)
+
+    with zipfile.ZipFile(io.BytesIO(zip_source) if isinstance(zip_source, bytes) else zip_source) as zf:
+        names = {info.filename.rstrip('/'): (info.filename, info.file_size)
+                 for info in zf.infolist() if not info.is_dir()}
+    top = _common_top_directory(names)
+    files = [(name[len(top):], size) for name, (_, size) in names.items()]
+    members = {name[len(top):]: member for name, (member, _) in names.items()}
+    reader = ArchiveReader({}, zip_source, members, member_limit=member_limit)
+    return _inventory_from_files(Path(archive_path).resolve(), files, skip_dirs, reader)
+
+
+def _scan_tar(archive: tarfile.TarFile, archive_path: str, skip_dirs: Optional[Iterable[str]],
+              wanted: Optional[Callable[[str], bool]], member_limit: int) -> FileInventory:
+    """Percorrer um tar em fluxo, lendo apenas os membros selecionados"""
+    sizes: Dict[str, int] = {}
+    contents: Dict[str, bytes] = {}
+    with archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            name = member.name[2:] if member.name.startswith('./') else member.name
+            sizes[name] = member.size
+            if wanted is None or wanted(name):
+                extracted = archive.extractfile(member)
+                if extracted is not None:
+                    contents[name] = extracted.read(member_limit)
+
+    top = _common_top_directory(sizes)
+    files = [(name[len(top):], size) for name, size in sizes.items()]
+    contents = {name[len(top):]: data for name, data in contents.items()}
+    return _inventory_from_files(Path(archive_path).resolve(), files, skip_dirs, ArchiveReader(contents))
+
+
+def _common_top_directory(names: Iterable[str]) -> str:
+    """Prefixo 'dir/' comum a todos os caminhos, ou '' se não houver"""
+    tops = {name.split('/', 1)[0] + '/' if '/' in name else '' for name in names}
+    return tops.pop() if len(tops) == 1 else ''
+
+
+def scan_project(project_path: Path, skip_dirs: Optional[Iterable[str]] = None,
+                 use_ignore_files: bool = True, cache: Optional[ScanCache] = None,
+                 backend: str = 'auto', budget: Optional[ScanBudget] = None,
+                 events: Optional[EventEmitter] = None,
+                 metrics: Optional[DetectionMetrics] = None) -> FileInventory:
+    """Percorrer o projeto uma única vez (em largura) e montar o inventário
+
+    Com backend 'auto', work trees git são enumeradas pelo índice do git
+    (sem travessia; ver scan_git_index); os demais diretórios, ou backend
+    'walk', são percorridos no disco. Diretórios em `skip_dirs` (padrão:
+    DEFAULT_SKIP_DIRS) e caminhos ignorados pelos arquivos .gitignore/.ignore
+    são podados sem serem visitados. Com `cache`, só diretórios cujo
+    mtime/inode mudou são listados novamente; os tamanhos de arquivos em
+    diretórios inalterados vêm do cache. Se o prazo de `budget` terminar, a
+    travessia para (os níveis rasos já foram visitados) e `coverage` do
+    inventário indica a fração de diretórios percorrida. Com `events`, cada
+    diretório visitado gera um evento 'directory'; com `metrics`, diretórios
+    listados e arquivos com stat são contados.
+    """
+    if backend == 'auto':
+        inventory = scan_git_index(project_path, skip_dirs, budget, events, metrics)
+        if inventory is not None:
+            return inventory
+
+    root = Path(project_path).resolve()
+    skip = DEFAULT_SKIP_DIRS if skip_dirs is None else frozenset(skip_dirs)
+    entries: List[FileEntry] = []
+    directories: List[str] = []
+    queue = deque([('', 0, IgnoreRules())])
+    visited = 0
+
+    while queue:
+        if budget is not None and budget.expired():
+            break
+        rel_dir, depth, rules = queue.popleft()
+        visited += 1
+        if events is not None:
+            events.emit('directory', path=rel_dir, depth=depth)
+        dir_path = root / rel_dir if rel_dir else root
+        try:
+            listing = None
+            if cache is not None:
+                st = os.stat(dir_path)
+                listing = cache.lookup_dir(rel_dir, st)
+            if listing is None:
+                listing = _list_directory(dir_path)
+                if cache is not None:
+                    cache.store_dir(rel_dir, st, listing)
+                if metrics is not None:
+                    metrics.count('directories_listed')
+                    metrics.count('files_stated', sum(1 for _, is_dir, _ in listing if not is_dir))
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            continue
+
+        if use_ignore_files:
+            for ignore_name in IGNORE_FILES:
+                if any(name == ignore_name and not is_dir for name, is_dir, _ in listing):
+                    rules = rules.extend(rel_dir, _read_ignore_file(dir_path / ignore_name))
+
+        for name, is_dir, size in listing:
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            if is_dir:
+                if name in skip or (rules.rules and rules.is_ignored(rel_path, True)):
+                    continue
+                directories.append(rel_path)
+                queue.append((rel_path, depth + 1, rules))
+            else:
+                if rules.rules and rules.is_ignored(rel_path, False):
+                    continue
+                entries.append(FileEntry(
+                    path=rel_path,
+                    name=name,
+                    extension=os.path.splitext(name)[1],
+                    size=size,
+                    depth=depth
+                ))
+
+    inventory = FileInventory(root, entries, directories)
+    inventory.coverage = visited / (visited + len(queue))
+    return inventory
+
+
+class ContentScanPool:
+    """Pool limitado para leitura/busca de conteúdo em paralelo
+
+    Threads atendem leituras (I/O); com `use_processes=True` um pool de
+    processos atende buscas pesadas em regex (a função precisa ser de nível
+    de módulo). Resultados sempre voltam na ordem de entrada, garantindo
+    evidências determinísticas.
+    """
+
+    def __init__(self, workers: Optional[int] = None, use_processes: bool = False):
+        self.workers = workers
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+
+    def __enter__(self) -> 'ContentScanPool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def map(self, func: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+        """Aplicar `func` a cada item, preservando a ordem"""
+        if self.workers == 1 or len(items) <= 1:
+            return [func(item) for item in items]
+
+        if self._executor is None:
+            executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = executor_class(max_workers=self.workers)
+
+        # Processos recebem lotes para amortizar o custo de serialização
+        chunksize = 1
+        if self.use_processes:
+            chunksize = max(1, len(items) // (4 * (self.workers or os.cpu_count() or 1)))
+        return list(self._executor.map(func, items, chunksize=chunksize))
+
+    def close(self):
+        """Encerrar workers, se criados"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None